@@ -16,6 +16,123 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = ""
     MEM0_API_KEY: str = ""
 
+    # Long-term memory backend: "mem0" (hosted) or "local" (services/local_memory.py)
+    MEMORY_BACKEND: str = "mem0"
+    LOCAL_MEMORY_PATH: str = "data/memory"
+    LOCAL_MEMORY_TOP_K: int = 5
+    LOCAL_MEMORY_MIN_SCORE: float = 0.35          # cosine similarity for a snippet to be relevant
+    LOCAL_MEMORY_DEDUP_SIMILARITY: float = 0.95   # near-identical snippets are stored once
+
+    # Storage backend: "supabase" or "sqlite" (local single-box / load testing)
+    DB_BACKEND: str = "supabase"
+    SQLITE_PATH: str = "data/local.db"
+    SQLITE_POOL_SIZE: int = 8
+
+    # Websocket history loading
+    HISTORY_PAGE_SIZE: int = 20           # messages per history / history_page frame
+    HISTORY_CONTEXT_MESSAGES: int = 20    # messages rebuilt into the graph state on connect
+
+    # Cached session state for websocket reconnects (services/session_store.py)
+    SESSION_STATE_MAX_SESSIONS: int = 5000
+    SESSION_STATE_MAX_MB: int = 64        # approximate; least recently used sessions go first
+    SESSION_STATE_IDLE_SECONDS: float = 1800
+
+    # Templated replies for confident small talk (services/fast_path.py)
+    FAST_PATH_MIN_SCORE: float = 0.75     # intent similarity needed to skip the LLM
+    FAST_PATH_VARIATIONS: bool = True     # mix extra phrasings into the verified responses
+    FAST_PATH_MAX_CHARS: int = 80         # longer messages always go to the LLM
+    FAST_PATH_MIN_EMOTION_CONFIDENCE: float = 0.6  # the turn's emotion must be this sure, and not negative
+
+    # Precomputed session starters (services/starter_pool.py)
+    STARTER_POOL_SIZE: int = 3
+    STARTER_TTL_SECONDS: float = 86400
+    STARTER_MAX_USERS: int = 10000
+    STARTER_REFRESH_MIN_INTERVAL: float = 300  # on memory saves; session ends always refresh
+
+    # Background assessment summaries
+    ASSESSMENT_SUMMARY_MAX_USERS: int = 10000
+    ASSESSMENT_CACHE_MAX_ENTRIES: int = 5000  # results cached by form content
+
+    # Mem0 search cache (services/memory_cache.py)
+    MEMORY_CACHE_SIMILARITY: float = 0.9  # cosine similarity for a query to reuse a cached search
+    MEMORY_CACHE_PER_USER: int = 8
+    MEMORY_CACHE_MAX_USERS: int = 5000
+    MEMORY_CACHE_TTL_SECONDS: float = 900
+
+    # Mem0 ingest queue (services/memory_ingest.py)
+    MEM0_INGEST_WORKERS: int = 2          # concurrent add calls (own executor lane)
+    MEM0_INGEST_MAX_BACKLOG: int = 5000   # queued turns; the oldest are dropped beyond this
+    MEM0_INGEST_BATCH_TURNS: int = 10     # max turns of one user coalesced into one add
+    MEM0_INGEST_DRAIN_TIMEOUT: float = 30.0  # seconds to finish the backlog on shutdown
+
+    # LLM backends, in order of preference (see core/llm.get_backends)
+    LLM_BACKENDS: str = "groq"            # e.g. "groq,groq_small,local"
+    GROQ_FALLBACK_MODEL: str = "llama-3.1-8b-instant"
+    LOCAL_LLM_BASE_URL: str = "http://localhost:8001/v1"
+    LOCAL_LLM_MODEL: str = "local"
+    LOCAL_LLM_API_KEY: str = "local"
+    LLM_BACKEND_TIMEOUT: float = 30.0     # seconds to a response (or first streamed token)
+    LLM_BACKEND_COOLDOWN: float = 10.0    # seconds a failed backend is skipped; grows with repeat failures
+    LLM_HEALTH_WINDOW: int = 50           # recent calls used for a backend's error rate
+    LLM_LATENCY_ALPHA: float = 0.2        # EWMA weight of the newest latency sample
+
+    # LLM scheduler
+    LLM_MAX_CONCURRENCY: int = 8          # concurrent calls to the provider
+    LLM_PER_USER_CONCURRENCY: int = 2
+    LLM_MAX_RETRIES: int = 3
+    LLM_BACKOFF_BASE: float = 1.0         # seconds; doubled per retry
+    LLM_BACKOFF_MAX: float = 60.0
+
+    # Conversation window sent to the LLM (approximate tokens)
+    CONTEXT_TOKEN_BUDGET: int = 2000      # fold older turns into the summary above this
+    CONTEXT_KEEP_TOKENS: int = 1200       # recent turns kept verbatim after folding
+    CONTEXT_SUMMARY_WORDS: int = 150
+    CONTEXT_SUMMARY_MAX_SESSIONS: int = 5000
+
+    # Per-dependency worker pools and call deadlines (core/executors.py)
+    DB_POOL_SIZE: int = 16                # Supabase / SQLite queries
+    DB_QUERY_TIMEOUT: float = 15.0
+    DB_SLOW_QUERY_MS: float = 500.0
+    MEM0_WORKERS: int = 4                 # Mem0 searches (adds go through the ingest queue)
+    MEM0_TIMEOUT: float = 10.0
+    EMOTION_MAX_CONCURRENCY: int = 16     # in-flight GoEmotions API requests
+    EMOTION_TIMEOUT: float = 5.0
+    MODEL_WORKERS: int = 2                # MiniLM encoding, risk model + SHAP
+    MODEL_TIMEOUT: float = 20.0
+
+    # Write-behind mood logging
+    MOOD_FLUSH_BATCH_SIZE: int = 50
+    MOOD_FLUSH_INTERVAL: float = 2.0
+    MOOD_QUEUE_MAX: int = 10000
+    MOOD_FLUSH_RETRIES: int = 3
+
+    # In-memory recent-mood ring buffers (hot tier for get_recent_moods)
+    MOOD_CACHE_SIZE: int = 20
+    MOOD_CACHE_MAX_USERS: int = 10000
+    MOOD_CACHE_IDLE_SECONDS: float = 1800.0
+    MOOD_CACHE_TTL_SECONDS: float = 600.0
+
+    # Dashboard LLM analysis cache (stale-while-revalidate)
+    ANALYSIS_CACHE_TTL_SECONDS: float = 3600.0
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 5000
+    ANALYSIS_MIN_REFRESH_SECONDS: float = 600.0  # at most one LLM refresh per user and window per interval
+
+    # Live dashboard push updates: per-subscription event backlog
+    DASHBOARD_EVENT_QUEUE_SIZE: int = 100
+
+    # Long-range analytics
+    ANALYTICS_CHUNK_SIZE: int = 5000      # rows requested per page (a backend may return fewer)
+    ANALYTICS_MAX_POINTS: int = 366
+
+    # Population-level analytics: intensity at or above this counts as a high-intensity turn
+    COHORT_HIGH_INTENSITY: float = 0.7
+
+    # Write-behind chat_history persistence
+    CHAT_FLUSH_BATCH_SIZE: int = 100
+    CHAT_FLUSH_INTERVAL: float = 0.5
+    CHAT_QUEUE_MAX: int = 20000
+    CHAT_FLUSH_RETRIES: int = 5
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore extra environment variables like elevenlabs_api_key
@@ -1,7 +1,18 @@
+import time
 from supabase import create_client, Client
 from .config import settings
+from .executors import get_executor
+from ..repositories.base import Repository
 
 supabase: Client = None
+repository: Repository = None
+
+# supabase-py is synchronous. Every query goes through the bounded "supabase" executor
+# lane so a slow round-trip only ties up one worker thread instead of the whole event loop.
+# The single client (and its underlying HTTP connection pool) is shared by all workers.
+
+# Per-query timing: name -> {"count", "errors", "total_ms", "max_ms"}
+query_stats = {}
 
 def init_supabase():
     global supabase
@@ -16,3 +27,60 @@ def init_supabase():
 
 def get_supabase() -> Client:
     return supabase
+
+def init_repository():
+    """Selects the storage backend for chat_history, mood_logs and user_assessments."""
+    global repository
+    backend = settings.DB_BACKEND.lower()
+    if backend == "sqlite":
+        from ..repositories.sqlite_repository import SQLiteRepository
+        try:
+            repository = SQLiteRepository(settings.SQLITE_PATH, pool_size=settings.SQLITE_POOL_SIZE)
+            print(f"SQLite repository initialized at {settings.SQLITE_PATH}.")
+        except Exception as e:
+            print(f"Failed to initialize SQLite repository: {e}")
+    elif backend == "supabase":
+        if supabase:
+            from ..repositories.supabase_repository import SupabaseRepository
+            repository = SupabaseRepository(supabase)
+    else:
+        print(f"Unknown DB_BACKEND '{settings.DB_BACKEND}'. Running in mock mode.")
+
+def get_repository() -> Repository:
+    return repository
+
+def _record_timing(name: str, elapsed_ms: float, ok: bool):
+    stats = query_stats.setdefault(name, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+    stats["count"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    if not ok:
+        stats["errors"] += 1
+    if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+        print(f"Slow query {name}: {elapsed_ms:.0f}ms")
+
+async def run_query(name: str, query, deadline: bool = True):
+    """
+    Runs a blocking Supabase call (e.g. `lambda: supabase.table(...).execute()`)
+    on the DB executor lane (within DB_QUERY_TIMEOUT) and records its latency under `name`.
+    Writes that must not be retried while still running pass `deadline=False`.
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = await get_executor("supabase").run(query, deadline=deadline)
+        ok = True
+        return result
+    finally:
+        _record_timing(name, (time.perf_counter() - start) * 1000, ok)
+
+def get_query_stats() -> dict:
+    return {
+        name: {
+            "count": s["count"],
+            "errors": s["errors"],
+            "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+            "max_ms": round(s["max_ms"], 1),
+        }
+        for name, s in query_stats.items()
+    }
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from .config import settings
+
+
+class DependencyExecutor:
+    """
+    Bounded lane for calls to one dependency, so a slow dependency only
+    exhausts its own workers.
+
+    `run` executes a blocking call on the lane's own thread pool of
+    `max_workers` threads; `call` awaits a coroutine (for async clients such
+    as httpx) under the same concurrency limit. Both enforce a deadline
+    (`timeout` by default): the caller gets TimeoutError, a call still queued
+    is cancelled, and a blocking call already running finishes in the
+    background (counted as `abandoned` until it does). Writes that are not
+    safe to retry pass `deadline=False` and wait for the call to finish, so a
+    retry can never overlap a write that is still running.
+
+    Saturation: `in_flight` / `queued` now, peak queue depth, time spent
+    waiting for a worker and time spent running.
+    """
+
+    def __init__(self, name: str, max_workers: int, timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()  # counters are updated from worker threads too
+
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.abandoned = 0
+        self.calls = 0
+        self.started = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+        self.run_ms_max = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "timeout_s": self.timeout,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "saturation": round(self.in_flight / self.max_workers, 2) if self.max_workers else 0.0,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "abandoned": self.abandoned,
+            "avg_wait_ms": round(self.wait_ms_total / self.started, 1) if self.started else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 1),
+            "avg_run_ms": round(self.run_ms_total / self.started, 1) if self.started else 0.0,
+            "max_run_ms": round(self.run_ms_max, 1),
+        }
+
+    def _submitted(self):
+        with self._lock:
+            self.calls += 1
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+    def _started(self, submitted_at: float):
+        wait_ms = (time.perf_counter() - submitted_at) * 1000
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+            self.started += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def _finished(self, started_at: float, ok: bool):
+        run_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            self.in_flight -= 1
+            self.run_ms_total += run_ms
+            self.run_ms_max = max(self.run_ms_max, run_ms)
+            if not ok:
+                self.errors += 1
+
+    def _timed_out(self, state: dict):
+        with self._lock:
+            self.timeouts += 1
+            if state["phase"] == "queued":
+                # Cancelled before a worker picked it up
+                self.queued -= 1
+                state["phase"] = "cancelled"
+            elif state["phase"] == "running":
+                self.abandoned += 1
+                state["phase"] = "abandoned"
+
+    async def run(self, fn, *args, timeout: Optional[float] = None, deadline: bool = True):
+        """Runs blocking `fn(*args)` on this lane's threads, within the deadline unless `deadline` is False."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        submitted_at = time.perf_counter()
+        state = {"phase": "queued"}
+        self._submitted()
+
+        def work():
+            with self._lock:
+                if state["phase"] == "cancelled":
+                    return None
+                state["phase"] = "running"
+            self._started(submitted_at)
+            started_at = time.perf_counter()
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                self._finished(started_at, ok)
+                with self._lock:
+                    if state["phase"] == "abandoned":
+                        self.abandoned -= 1
+                    state["phase"] = "done"
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, work)
+        if not deadline:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(state)
+            raise TimeoutError(f"{self.name} call exceeded {timeout or self.timeout}s")
+
+    async def call(self, coro_fn, *args, timeout: Optional[float] = None, deadline: bool = True):
+        """Awaits `coro_fn(*args)` under this lane's concurrency limit, within the deadline unless `deadline` is False."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        submitted_at = time.perf_counter()
+        self._submitted()
+        limit = (timeout or self.timeout) if deadline else None
+        try:
+            await asyncio.wait_for(self._slots.acquire(), limit)
+        except asyncio.TimeoutError:
+            self._timed_out({"phase": "queued"})
+            raise TimeoutError(f"{self.name} call waited over {limit}s for a slot")
+
+        try:
+            self._started(submitted_at)
+            started_at = time.perf_counter()
+            ok = False
+            try:
+                remaining = max(limit - (started_at - submitted_at), 0.001) if limit else None
+                result = await asyncio.wait_for(coro_fn(*args), remaining)
+                ok = True
+                return result
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                raise TimeoutError(f"{self.name} call exceeded {limit}s")
+            finally:
+                self._finished(started_at, ok)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# One lane per dependency: Supabase/SQLite queries, Mem0 reads, Mem0 ingest
+# (services/memory_ingest.py), the GoEmotions API, and local CPU models
+# (MiniLM encoding, the risk model and SHAP).
+executors = {
+    "supabase": DependencyExecutor("supabase", settings.DB_POOL_SIZE, settings.DB_QUERY_TIMEOUT),
+    "mem0": DependencyExecutor("mem0", settings.MEM0_WORKERS, settings.MEM0_TIMEOUT),
+    "mem0_ingest": DependencyExecutor("mem0_ingest", settings.MEM0_INGEST_WORKERS, settings.MEM0_TIMEOUT),
+    "emotion": DependencyExecutor("emotion", settings.EMOTION_MAX_CONCURRENCY, settings.EMOTION_TIMEOUT),
+    "models": DependencyExecutor("models", settings.MODEL_WORKERS, settings.MODEL_TIMEOUT),
+}
+
+
+def get_executor(name: str) -> DependencyExecutor:
+    return executors[name]
+
+
+def get_executor_stats() -> dict:
+    return {name: executor.stats() for name, executor in executors.items()}
+
+
+def shutdown_executors():
+    for executor in executors.values():
+        executor.shutdown()
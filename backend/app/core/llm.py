@@ -1,11 +1,50 @@
 from langchain_groq import ChatGroq
 from .config import settings
 
-def get_llm():
+def get_llm(model: str = None):
     return ChatGroq(
         api_key=settings.GROQ_API_KEY,
-        model=settings.MODEL_NAME,
-        temperature=0.7
+        model=model or settings.MODEL_NAME,
+        temperature=0.7,
+        # Retries (and 429 backoff) are handled by core/llm_scheduler.py
+        max_retries=0
     )
 
-llm = get_llm()
+def get_local_llm():
+    # Any OpenAI-compatible server: vLLM, llama.cpp, Ollama, or app/dev/local_llm.py
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        base_url=settings.LOCAL_LLM_BASE_URL,
+        api_key=settings.LOCAL_LLM_API_KEY,
+        model=settings.LOCAL_LLM_MODEL,
+        temperature=0.7,
+        max_retries=0
+    )
+
+def get_backends():
+    """
+    Chat-model backends named in LLM_BACKENDS, in order of preference:
+      - "groq":       MODEL_NAME on Groq
+      - "groq_small": GROQ_FALLBACK_MODEL on Groq (a smaller model with separate rate limits)
+      - "local":      an OpenAI-compatible server at LOCAL_LLM_BASE_URL
+    """
+    factories = {
+        "groq": get_llm,
+        "groq_small": lambda: get_llm(settings.GROQ_FALLBACK_MODEL),
+        "local": get_local_llm,
+    }
+    backends = {}
+    for name in settings.LLM_BACKENDS.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in factories:
+            print(f"Unknown LLM backend '{name}', skipping.")
+            continue
+        try:
+            backends[name] = factories[name]()
+        except Exception as e:
+            print(f"Failed to initialize LLM backend '{name}': {e}")
+    if not backends:
+        backends["groq"] = get_llm()
+    return backends
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Dict
+from .config import settings
+from .llm import get_backends
+
+
+class BackendHealth:
+    """Rolling latency (EWMA, time to first token for streams) and error rate for one backend."""
+
+    def __init__(self, window: int, alpha: float):
+        self.alpha = alpha
+        self.latency_ms = None
+        self.outcomes = deque(maxlen=window)  # True = success
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def record_success(self, latency_ms: float):
+        self.calls += 1
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.alpha * (latency_ms - self.latency_ms)
+
+    def record_failure(self, cooldown: float):
+        self.calls += 1
+        self.errors += 1
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        # Back off harder from a backend that keeps failing (capped at 8x)
+        factor = 2 ** min(self.consecutive_failures - 1, 3)
+        self.cooldown_until = time.monotonic() + cooldown * factor
+
+
+class LLMRouter:
+    """
+    Chat-model facade over several configured backends (see core/llm.get_backends).
+
+    Each call goes to the fastest healthy backend: lowest rolling latency,
+    penalised by its recent error rate. Backends that have not been measured
+    yet are tried first so they get a latency. On an error or a timeout the
+    call fails over to the next backend; a failing backend is put in a
+    cooldown that grows while it keeps failing. Backends in cooldown are
+    still used as a last resort. Streams only fail over before their first
+    chunk, since tokens already sent can't be taken back.
+    """
+
+    def __init__(self, backends: Dict[str, object], timeout: float, cooldown: float, window: int, alpha: float):
+        self.backends = backends
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.health = {name: BackendHealth(window, alpha) for name in backends}
+        self.failovers = 0
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "failovers": self.failovers,
+            "backends": {
+                name: {
+                    "healthy": h.healthy(now),
+                    "latency_ms": round(h.latency_ms, 1) if h.latency_ms is not None else None,
+                    "error_rate": round(h.error_rate, 3),
+                    "calls": h.calls,
+                    "errors": h.errors,
+                }
+                for name, h in self.health.items()
+            },
+        }
+
+    def _ranked(self) -> list:
+        now = time.monotonic()
+
+        def score(name):
+            h = self.health[name]
+            if h.latency_ms is None:
+                return 0.0
+            # Expected cost of a call, counting a failed attempt as a full extra round trip
+            return h.latency_ms * (1 + h.error_rate)
+
+        healthy = sorted((n for n in self.backends if self.health[n].healthy(now)), key=score)
+        cooling = sorted((n for n in self.backends if not self.health[n].healthy(now)),
+                         key=lambda n: self.health[n].cooldown_until)
+        return healthy + cooling
+
+    async def ainvoke(self, messages: list):
+        last_error = None
+        for attempt, name in enumerate(self._ranked()):
+            if attempt:
+                self.failovers += 1
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self.backends[name].ainvoke(messages), self.timeout)
+            except Exception as e:
+                print(f"LLM backend '{name}' failed: {e!r}")
+                self.health[name].record_failure(self.cooldown)
+                last_error = e
+                continue
+            self.health[name].record_success((time.perf_counter() - started) * 1000)
+            return response
+        raise last_error
+
+    async def astream(self, messages: list) -> AsyncIterator:
+        last_error = None
+        for attempt, name in enumerate(self._ranked()):
+            if attempt:
+                self.failovers += 1
+            started = time.perf_counter()
+            stream = self.backends[name].astream(messages).__aiter__()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), self.timeout)
+            except StopAsyncIteration:
+                self.health[name].record_success((time.perf_counter() - started) * 1000)
+                return
+            except Exception as e:
+                print(f"LLM backend '{name}' failed: {e!r}")
+                self.health[name].record_failure(self.cooldown)
+                last_error = e
+                await stream.aclose()
+                continue
+
+            self.health[name].record_success((time.perf_counter() - started) * 1000)
+            yield first
+            try:
+                async for chunk in stream:
+                    yield chunk
+            except Exception:
+                # Too late to fail over, but the backend still gets the blame
+                self.health[name].record_failure(self.cooldown)
+                raise
+            return
+        raise last_error
+
+
+llm_router = LLMRouter(
+    get_backends(),
+    timeout=settings.LLM_BACKEND_TIMEOUT,
+    cooldown=settings.LLM_BACKEND_COOLDOWN,
+    window=settings.LLM_HEALTH_WINDOW,
+    alpha=settings.LLM_LATENCY_ALPHA,
+)
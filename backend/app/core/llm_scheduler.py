@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import time
+from collections import Counter
+from typing import AsyncIterator, Optional
+from .config import settings
+from .llm_router import llm_router
+
+# Lower value runs first. Background work only gets slots live chat isn't using.
+PRIORITIES = {"crisis": 0, "chat": 1, "assessment": 2, "analytics": 3}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Seconds from a rate-limit header value: "12", "7.66s", "2m59.56s", "450ms"."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+class LLMScheduler:
+    """
+    Single gate in front of the LLM router (and so every chat-model backend).
+
+    Calls wait in per-priority queues (crisis > chat > assessment > analytics)
+    and are admitted while fewer than `max_concurrency` calls are running and
+    the caller's user has fewer than `per_user_concurrency` in flight (crisis
+    replies skip the per-user cap). A 429 pauses all admissions for the delay
+    given by the provider's rate-limit headers, halves the effective
+    concurrency, and retries the call; successes grow the limit back one slot
+    at a time.
+    """
+
+    def __init__(self, model, max_concurrency: int, per_user_concurrency: int, max_retries: int,
+                 backoff_base: float, backoff_max: float):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.per_user_concurrency = per_user_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.limit = max_concurrency
+        self._active = 0
+        self._active_per_user = Counter()
+        self._waiting = []  # heap of (priority, seq, user_id, future)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._resume_handle = None
+
+        self.rate_limited = 0
+        self.failed = 0
+        self._waits = {name: {"calls": 0, "total_ms": 0.0, "max_ms": 0.0} for name in PRIORITIES}
+
+    def stats(self) -> dict:
+        waiting = Counter(p for p, _, _, fut in self._waiting if not fut.done())
+        return {
+            "active": self._active,
+            "limit": self.limit,
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "queues": {
+                name: {
+                    "waiting": waiting.get(PRIORITIES[name], 0),
+                    "calls": w["calls"],
+                    "avg_wait_ms": round(w["total_ms"] / w["calls"], 2) if w["calls"] else 0.0,
+                    "max_wait_ms": round(w["max_ms"], 2),
+                }
+                for name, w in self._waits.items()
+            },
+        }
+
+    async def ainvoke(self, messages: list, priority: str = "chat", user_id: Optional[str] = None):
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, user_id)
+            try:
+                response = await self.model.ainvoke(messages)
+                self._on_success()
+                return response
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self.failed += 1
+                    raise
+            finally:
+                self._release(priority, user_id)
+            await asyncio.sleep(delay)
+
+    async def astream(self, messages: list, priority: str = "chat", user_id: Optional[str] = None) -> AsyncIterator:
+        """Streams chunks; the slot is held until the stream ends. Only retried before the first chunk."""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, user_id)
+            started = False
+            try:
+                async for chunk in self.model.astream(messages):
+                    started = True
+                    yield chunk
+                self._on_success()
+                return
+            except Exception as e:
+                delay = None if started else self._retry_delay(e, attempt)
+                if delay is None:
+                    self.failed += 1
+                    raise
+            finally:
+                self._release(priority, user_id)
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, priority: str, user_id: Optional[str]):
+        level = PRIORITIES.get(priority, PRIORITIES["analytics"])
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (level, next(self._seq), user_id, future))
+        queued_at = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._release(priority, user_id)
+            raise
+        wait_ms = (time.perf_counter() - queued_at) * 1000
+        w = self._waits[priority if priority in self._waits else "analytics"]
+        w["calls"] += 1
+        w["total_ms"] += wait_ms
+        w["max_ms"] = max(w["max_ms"], wait_ms)
+
+    def _release(self, priority: str, user_id: Optional[str]):
+        self._active -= 1
+        if user_id and priority != "crisis":
+            self._active_per_user[user_id] -= 1
+            if self._active_per_user[user_id] <= 0:
+                del self._active_per_user[user_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        if time.monotonic() < self._paused_until:
+            return
+        blocked = []
+        while self._waiting and self._active < self.limit:
+            entry = heapq.heappop(self._waiting)
+            level, _, user_id, future = entry
+            if future.done():
+                continue
+            capped = user_id and level != PRIORITIES["crisis"]
+            if capped and self._active_per_user[user_id] >= self.per_user_concurrency:
+                blocked.append(entry)
+                continue
+            self._active += 1
+            if capped:
+                self._active_per_user[user_id] += 1
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiting, entry)
+
+    def _on_success(self):
+        if self.limit < self.max_concurrency:
+            self.limit += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # A little jitter so retrying callers don't all hit the provider at the same instant
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(1.0, 1.2)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds this caller should sleep before retrying, or None to give up.
+        Rate limits pause every caller instead (the retry just re-queues).
+        """
+        if attempt >= self.max_retries:
+            return None
+        code = _status_code(error)
+        if code == 429:
+            self.rate_limited += 1
+            self.limit = max(1, self.limit // 2)
+            self._pause(self._rate_limit_delay(error, attempt))
+            return 0.0
+        if (code is not None and code >= 500) or isinstance(error, (ConnectionError, asyncio.TimeoutError)):
+            return self._backoff(attempt)
+        return None
+
+    def _rate_limit_delay(self, error: Exception, attempt: int) -> float:
+        """Retry-After if given, else the reset time of whichever limit is exhausted."""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        delay = _parse_duration(headers.get("retry-after"))
+        if delay is None:
+            resets = [
+                _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                for kind in ("requests", "tokens")
+                if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+            ]
+            resets = [r for r in resets if r is not None]
+            delay = max(resets) if resets else None
+        if delay is None:
+            return self._backoff(attempt)
+        return min(self.backoff_max, delay) * random.uniform(1.0, 1.2)
+
+    def _pause(self, delay: float):
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        self._resume_handle = loop.call_later(self._paused_until - time.monotonic(), self._dispatch)
+
+
+llm_scheduler = LLMScheduler(
+    llm_router,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    per_user_concurrency=settings.LLM_PER_USER_CONCURRENCY,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_base=settings.LLM_BACKOFF_BASE,
+    backoff_max=settings.LLM_BACKOFF_MAX,
+)
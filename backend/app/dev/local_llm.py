@@ -0,0 +1,89 @@
+"""
+Local OpenAI-compatible stand-in for the "local" LLM backend.
+
+Serves /v1/chat/completions (plain and streamed) with canned supportive
+replies, so routing and failover can be exercised without a real model:
+
+    uvicorn app.dev.local_llm:app --port 8001
+    LLM_BACKENDS=groq,local uvicorn app.main:app
+
+LOCAL_LLM_DELAY_MS adds latency before the first token and LOCAL_LLM_FAIL_RATE
+(0-1) makes that share of requests fail with a 503.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+DELAY_MS = float(os.getenv("LOCAL_LLM_DELAY_MS", "0"))
+FAIL_RATE = float(os.getenv("LOCAL_LLM_FAIL_RATE", "0"))
+
+REPLIES = [
+    "That sounds like a lot to carry. Do you want to tell me a bit more about what's been going on?",
+    "Thanks for sharing that with me. How has it been affecting your day?",
+    "I'm here with you. What do you think would help most right now, even a little?",
+]
+
+app = FastAPI()
+
+
+def _reply(messages: list) -> str:
+    # Deterministic per conversation so repeated runs are comparable
+    return REPLIES[len(messages) % len(REPLIES)]
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "local", "object": "model", "owned_by": "local"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    if random.random() < FAIL_RATE:
+        raise HTTPException(status_code=503, detail="Local stand-in failure (LOCAL_LLM_FAIL_RATE)")
+    if DELAY_MS:
+        await asyncio.sleep(DELAY_MS / 1000)
+
+    model = body.get("model", "local")
+    text = _reply(body.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())},
+        }
+
+    async def events():
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(0.01)
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -2,18 +2,30 @@ from typing import Dict, Any, Optional
 from langchain_core.messages import AIMessage, SystemMessage
 from langchain_groq import ChatGroq
 from ..core.config import settings
+from ..core.executors import get_executor
 from ..services.intent_engine import intent_engine
 from ..services.emotion_service import detect_emotion
 from ..services.mood_tracker import log_mood, get_recent_moods
 from ..services.ml_service import get_user_risk_profile
 from ..services.user_service import get_latest_assessment
 from ..services.memory_service import memory_service
-from ..core.llm import llm
+from ..services.fast_path import fast_path
+from ..core.llm_scheduler import llm_scheduler
 from .state import AgentState
 
 # Initialize LLM (Moved to core/llm.py)
 
 
+async def _stream_reply(messages: list, priority: str, user_id: str) -> AIMessage:
+    """
+    Generates the reply with a streaming call so the graph's "messages" stream
+    sees every token as it arrives (the websocket forwards them as delta frames).
+    Returns the complete reply as a single AIMessage for the state.
+    """
+    response = None
+    async for chunk in llm_scheduler.astream(messages, priority=priority, user_id=user_id):
+        response = chunk if response is None else response + chunk
+    return AIMessage(content=response.content if response is not None else "")
 
 def _most_frequent_recent_emotion(recent_moods: list, window: int = 6) -> Optional[str]:
     if not recent_moods:
@@ -30,6 +42,25 @@ def _most_frequent_recent_emotion(recent_moods: list, window: int = 6) -> Option
     return max(counts, key=counts.get)
 
 
+def _trend_risk(recent_moods: list) -> int:
+    """Heuristic risk from the recent mood trend: elevated once sadness shows up 3+ times."""
+    sadness_count = sum(1 for m in recent_moods if m.get("emotion") == "sadness")
+    return 5 if sadness_count >= 3 else 0
+
+
+async def _latest_risk(user_id: str) -> Optional[dict]:
+    """{"prediction", "confidence"} of the user's latest assessment (memory first, then DB), or None."""
+    risk_profile = get_user_risk_profile(user_id)
+    if not risk_profile:
+        db_record = await get_latest_assessment(user_id)
+        if db_record:
+            risk_profile = {
+                "prediction": db_record.get("risk_prediction"),
+                "confidence": db_record.get("risk_confidence")
+            }
+    return risk_profile
+
+
 async def perception_node(state: AgentState) -> Dict[str, Any]:
     """
     Returns a dict with keys:
@@ -38,13 +69,21 @@ async def perception_node(state: AgentState) -> Dict[str, Any]:
       - emotion_confidence
       - emotion_source            ("classifier" | "history" | "uncertain")
       - retrieved_response
+      - fast_path                 (True: answer from intents.json, skip the LLM)
     This is backwards-compatible with previous file (it still provides current_emotion).
     """
     last_message = state["messages"][-1].content
     user_id = state.get("user_id", "default_user")
 
-    # 1. Detect Intent
-    tag, verified_response = intent_engine.detect_intent(last_message)
+    # 1. Detect Intent (MiniLM encoding runs on the CPU-model lane, off the event loop)
+    try:
+        tag, verified_response, intent_score = await get_executor("models").run(
+            intent_engine.detect_intent_scored, last_message
+        )
+    except Exception as e:
+        print(f"Error detecting intent: {e}")
+        tag, verified_response, intent_score = "unknown", "I'm not sure I understand, but I'm here to listen.", 0.0
+    recent_moods = await get_recent_moods(user_id)
 
     # 2. Detect Emotion (support both string or {label, confidence})
     raw_emotion = await detect_emotion(last_message)
@@ -56,8 +95,29 @@ async def perception_node(state: AgentState) -> Dict[str, Any]:
         emotion_label = raw_emotion
         emotion_conf = 1.0
 
-    # 3. Blend with recent moods (history) to reduce single-turn noise
-    recent_moods = await get_recent_moods(user_id)
+    # 3. Log Mood (keep original signature)
+    # We continue logging the raw detection (label + confidence if available) for audit.
+    risk_profile = await _latest_risk(user_id)
+    risk_score = 0.0
+    if risk_profile:
+        # We store the confidence of the prediction as "intensity" (risk score)
+        # Ideally this should be the probability of the positive class (Risk)
+        risk_score = float(risk_profile.get("confidence") or 0.0)
+    await log_mood(user_id, emotion_label, last_message, intensity=risk_score)
+
+    # Confident, short small talk (greetings, thanks, ...) in a calm turn from a user
+    # with no risk trend or at-risk assessment is answered from the verified responses
+    if fast_path.eligible(
+        tag, intent_score, last_message, emotion_label, emotion_conf,
+        _trend_risk(recent_moods), risk_profile.get("prediction") if risk_profile else None
+    ):
+        return {
+            "current_intent": tag,
+            "retrieved_response": verified_response,
+            "fast_path": True
+        }
+
+    # 4. Blend with recent moods (history) to reduce single-turn noise
     historical_mode = _most_frequent_recent_emotion(recent_moods)
 
     if emotion_conf < 0.6 and historical_mode:
@@ -70,27 +130,6 @@ async def perception_node(state: AgentState) -> Dict[str, Any]:
         inferred_emotion = emotion_label or (historical_mode or "neutral")
         inferred_source = "classifier" if emotion_label else "history"
 
-    # 4. Log Mood (keep original signature)
-    # We continue logging the raw detection (label + confidence if available) for audit.
-    
-    # Fetch Risk for Logging
-    risk_profile = get_user_risk_profile(user_id)
-    if not risk_profile:
-        db_record = await get_latest_assessment(user_id)
-        if db_record:
-            risk_profile = {
-                "prediction": db_record.get("risk_prediction"),
-                "confidence": db_record.get("risk_confidence")
-            }
-            
-    risk_score = 0.0
-    if risk_profile:
-        # We store the confidence of the prediction as "intensity" (risk score)
-        # Ideally this should be the probability of the positive class (Risk)
-        risk_score = float(risk_profile.get("confidence", 0.0))
-
-    await log_mood(user_id, emotion_label, last_message, intensity=risk_score)
-
     # 5. Retrieve Therapeutic Context (Mem0)
     mem0_context = await memory_service.get_therapeutic_context(user_id, last_message)
 
@@ -100,10 +139,17 @@ async def perception_node(state: AgentState) -> Dict[str, Any]:
         "emotion_confidence": emotion_conf,
         "emotion_source": inferred_source,
         "retrieved_response": verified_response,
-        "mem0_context": mem0_context
+        "mem0_context": mem0_context,
+        "fast_path": False
     }
 
 
+async def fast_reply_node(state: AgentState) -> Dict[str, Any]:
+    """Templated reply for fast-path intents (see services/fast_path.py). No LLM call."""
+    last_reply = next((m.content for m in reversed(state["messages"]) if isinstance(m, AIMessage)), None)
+    return {"messages": [AIMessage(content=fast_path.reply(state["current_intent"], last_reply))]}
+
+
 async def wellness_logic_node(state: AgentState) -> Dict[str, Any]:
     """
     Returns:
@@ -117,11 +163,7 @@ async def wellness_logic_node(state: AgentState) -> Dict[str, Any]:
 
     # Trend Analysis
     recent_moods = await get_recent_moods(user_id)
-    sadness_count = sum(1 for m in recent_moods if m.get("emotion") == "sadness")
-
-    risk_score = 0
-    if sadness_count >= 3:
-        risk_score = 5  # Elevated risk (heuristic)
+    risk_score = _trend_risk(recent_moods)
 
     # Recommendation bank
     rec_bank = {
@@ -174,8 +216,7 @@ async def generation_node(state: AgentState) -> Dict[str, Any]:
       - state['risk_score'] (optional)
       - state['emotion_confidence'] / 'emotion_source' (optional)
 
-    Side-effect:
-      - updates state['last_recommendation'] to avoid repetition.
+    Also returns 'last_recommendation' (outside crisis mode) so the next turn can avoid repetition.
     """
     intent = state.get("current_intent", "unknown")
     emotion = state.get("current_emotion", "neutral")
@@ -185,6 +226,8 @@ async def generation_node(state: AgentState) -> Dict[str, Any]:
     emotion_conf = state.get("emotion_confidence", 1.0)
     emotion_source = state.get("emotion_source", "classifier")
     mem0_context = state.get("mem0_context", "")
+    conversation_summary = state.get("conversation_summary", "")
+    summary_context = f"\nEarlier in this conversation: {conversation_summary}\n" if conversation_summary else ""
 
     # CRISIS MODE: validation-first, structured probing
     if intent in ("crisis", "suicidal") or risk_score >= 7:
@@ -198,10 +241,11 @@ async def generation_node(state: AgentState) -> Dict[str, Any]:
             "If country is unknown, ask: 'Which country are you in so I can give local resources?'\n"
             "- Avoid abrupt policy-only refusals. Use supportive, non-judgmental language throughout.\n"
             "- Do not provide instructions for self-harm or attempt to minimize the user's feelings.\n"
+            f"{summary_context}"
         )
         messages = [SystemMessage(content=crisis_system)] + state["messages"]
         # Note: keep temperature / other low-level params as configured in the llm instance.
-        response = await llm.ainvoke(messages)
+        response = await _stream_reply(messages, "crisis", state.get("user_id"))
         return {"messages": [response]}
 
     # Fetch User Risk Profile (if available)
@@ -294,7 +338,8 @@ async def generation_node(state: AgentState) -> Dict[str, Any]:
         f"- Suggested coping strategy: {recommendation}\n"
         f"- Expert anchor text: {anchor}\n"
         f"{mem0_context}"
-        f"{risk_context}\n\n"
+        f"{risk_context}\n"
+        f"{summary_context}\n"
         "Guidelines:\n"
         "1. **Natural Conversation**: Speak naturally and casually. Avoid formal greetings like 'It is nice to connect with you'.\n"
         "2. **Emotion Handling**: Use the detected emotion to guide your tone, but NEVER explicitly state 'I sense you are feeling X' or 'I detect Y'. Just match their energy.\n"
@@ -306,9 +351,7 @@ async def generation_node(state: AgentState) -> Dict[str, Any]:
     )
 
     messages = [SystemMessage(content=system_prompt)] + state["messages"]
-    response = await llm.ainvoke(messages)
+    response = await _stream_reply(messages, "chat", user_id)
 
     # Track last recommendation to avoid immediate repetition in next cycle
-    state["last_recommendation"] = recommendation
-
-    return {"messages": [response]}
+    return {"messages": [response], "last_recommendation": recommendation}
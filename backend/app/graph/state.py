@@ -14,3 +14,5 @@ class AgentState(TypedDict):
     last_recommendation: str
     user_id: str
     mem0_context: str
+    conversation_summary: str
+    fast_path: bool
@@ -1,6 +1,9 @@
 from langgraph.graph import StateGraph, START, END
 from .state import AgentState
-from .nodes import perception_node, wellness_logic_node, generation_node
+from .nodes import perception_node, wellness_logic_node, generation_node, fast_reply_node
+
+def route_after_perception(state: AgentState) -> str:
+    return "fast_reply" if state.get("fast_path") else "wellness"
 
 def create_workflow():
     workflow = StateGraph(AgentState)
@@ -9,12 +12,14 @@ def create_workflow():
     workflow.add_node("perception", perception_node)
     workflow.add_node("wellness", wellness_logic_node)
     workflow.add_node("generator", generation_node)
+    workflow.add_node("fast_reply", fast_reply_node)
 
     # Add Edges
     workflow.add_edge(START, "perception")
-    workflow.add_edge("perception", "wellness")
+    workflow.add_conditional_edges("perception", route_after_perception, ["wellness", "fast_reply"])
     workflow.add_edge("wellness", "generator")
     workflow.add_edge("generator", END)
+    workflow.add_edge("fast_reply", END)
 
     return workflow.compile()
 
@@ -0,0 +1,39 @@
+"""
+Rebuilds mood_daily_rollups from the full mood_logs table.
+Run once after creating the table (and any time it needs repairing):
+
+    python -m app.jobs.backfill_mood_rollups
+"""
+import time
+from ..core.database import init_supabase, init_repository, get_repository
+from ..services.mood_rollups import rollup_mood_rows
+
+PAGE_SIZE = 1000
+
+
+def main():
+    init_supabase()
+    init_repository()
+    repo = get_repository()
+    if not repo:
+        print("No database configured, nothing to backfill.")
+        return
+
+    start = time.perf_counter()
+    totals = {}
+    after = None
+    scanned = 0
+    while True:
+        page = repo.fetch_mood_logs_page(after, PAGE_SIZE)
+        if not page:
+            break
+        rollup_mood_rows(page, totals)
+        scanned += len(page)
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    repo.replace_mood_rollups(list(totals.values()))
+    print(f"Rolled up {scanned} mood logs into {len(totals)} user-days in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
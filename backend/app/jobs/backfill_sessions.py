@@ -0,0 +1,25 @@
+"""
+Rebuilds the chat_sessions summary index from the full chat_history table.
+Run once after creating the table (and any time it needs repairing):
+
+    python -m app.jobs.backfill_sessions
+"""
+import time
+from ..core.database import init_supabase, init_repository, get_repository
+
+
+def main():
+    init_supabase()
+    init_repository()
+    repo = get_repository()
+    if not repo:
+        print("No database configured, nothing to backfill.")
+        return
+
+    start = time.perf_counter()
+    count = repo.rebuild_session_summaries()
+    print(f"Backfilled {count} sessions in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
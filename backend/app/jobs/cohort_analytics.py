@@ -0,0 +1,33 @@
+"""
+Recomputes the population-level cohort_daily_aggregates for recent days.
+Schedule it (e.g. hourly via cron) and use --days to backfill history:
+
+    python -m app.jobs.cohort_analytics --days 30
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from ..core.database import init_supabase, init_repository, get_repository
+from ..services.cohort_analytics import rebuild_cohort_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=2, help="number of most recent UTC days to recompute")
+    args = parser.parse_args()
+
+    init_supabase()
+    init_repository()
+    repo = get_repository()
+    if not repo:
+        print("No database configured, nothing to aggregate.")
+        return
+
+    start_day = (datetime.now(timezone.utc).date() - timedelta(days=args.days - 1)).isoformat()
+    start = time.perf_counter()
+    count = rebuild_cohort_aggregates(repo, start_day)
+    print(f"Aggregated {count} days since {start_day} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
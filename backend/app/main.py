@@ -3,7 +3,23 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import chat, auth, assessment, voice, analytics
-from .core.database import init_supabase
+from .core.database import init_supabase, init_repository, get_query_stats
+from .core.executors import get_executor_stats, shutdown_executors
+from .services.mood_writer import mood_writer
+from .services.chat_writer import chat_writer
+from .services.memory_ingest import memory_ingest
+from .services.mood_cache import mood_cache
+from .services.analysis_cache import analysis_cache
+from .services.dashboard_events import dashboard_events
+from .services.context_window import conversation_window
+from .core.llm_scheduler import llm_scheduler
+from .core.llm_router import llm_router
+from .services.fast_path import fast_path
+from .services.starter_pool import starter_pool
+from .services.assessment_summary import assessment_summaries
+from .services.assessment_cache import assessment_cache
+from .services.memory_cache import memory_search_cache
+from .services.session_store import session_store
 import os
 
 app = FastAPI(title="Mental Health Support Platform")
@@ -19,6 +35,55 @@ app.add_middleware(
 
 # Initialize DB
 init_supabase()
+init_repository()
+
+@app.on_event("startup")
+async def start_background_writers():
+    await mood_writer.start()
+    await chat_writer.start()
+    await memory_ingest.start()
+
+@app.on_event("shutdown")
+async def stop_background_writers():
+    # Flush anything still buffered before the process exits
+    await mood_writer.stop()
+    await chat_writer.stop()
+    await memory_ingest.stop()
+    shutdown_executors()
+
+@app.get("/health/queues")
+async def queue_health():
+    return {
+        "mood_logs": mood_writer.stats(),
+        "chat_history": chat_writer.stats(),
+        "memory_ingest": memory_ingest.stats(),
+        "dashboard_events": dashboard_events.stats(),
+        "assessment_summaries": assessment_summaries.stats()
+    }
+
+@app.get("/health/caches")
+async def cache_health():
+    return {
+        "recent_moods": mood_cache.stats(),
+        "dashboard_analysis": analysis_cache.stats(),
+        "conversation_summaries": conversation_window.stats(),
+        "session_starters": starter_pool.stats(),
+        "assessments": assessment_cache.stats(),
+        "memory_search": memory_search_cache.stats(),
+        "session_state": session_store.stats()
+    }
+
+@app.get("/health/llm")
+async def llm_health():
+    return {"scheduler": llm_scheduler.stats(), "router": llm_router.stats(), "fast_path": fast_path.stats()}
+
+@app.get("/health/db")
+async def db_health():
+    return get_query_stats()
+
+@app.get("/health/executors")
+async def executor_health():
+    return get_executor_stats()
 
 # Include Routers
 app.include_router(chat.router)
@@ -0,0 +1,164 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+
+def summarize_chat_rows(rows: List[dict]) -> List[dict]:
+    """
+    Folds chronologically ordered chat_history rows into one chat_sessions
+    delta per session: latest message as preview, its time, and the row count.
+    """
+    sessions = {}
+    for row in rows:
+        sid = row["session_id"]
+        summary = sessions.get(sid)
+        if summary is None:
+            summary = sessions[sid] = {"session_id": sid, "user_id": row["user_id"], "message_count": 0}
+        summary["preview"] = row["content"]
+        summary["last_message_at"] = row["created_at"]
+        summary["message_count"] += 1
+    return list(sessions.values())
+
+
+class Repository(ABC):
+    """
+    Storage contract for the chat_history, mood_logs and user_assessments tables.
+    Methods are blocking; services call them through `run_query` so they execute
+    on the DB worker pool. Rows are plain dicts shaped like the Supabase tables
+    (`created_at` is an ISO-8601 string).
+    """
+
+    # --- chat_history ---
+    @abstractmethod
+    def insert_chat_messages(self, rows: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def fetch_chat_history(self, session_id: str, limit: int, before: Optional[Tuple[str, object]] = None) -> List[dict]:
+        """
+        Latest `limit` messages of a session, newest first.
+        `before` is the (created_at, id) of the oldest message already loaded; id may be
+        None, in which case only messages strictly older than created_at are returned.
+        """
+
+    @abstractmethod
+    def fetch_user_messages(self, user_id: str, limit: int) -> List[dict]:
+        """Latest `limit` messages (session_id, content, created_at) of a user, newest first."""
+
+    @abstractmethod
+    def fetch_chat_history_page(self, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        """
+        Keyset scan over all of chat_history in (created_at, id) order.
+        `after` is the (created_at, id) of the last row of the previous page.
+        """
+
+    # --- chat_sessions (summary index over chat_history) ---
+    @abstractmethod
+    def upsert_session_activity(self, deltas: List[dict]) -> None:
+        """Applies `summarize_chat_rows` deltas: counts are added, preview/time replaced."""
+
+    @abstractmethod
+    def replace_session_summaries(self, summaries: List[dict]) -> None:
+        """Writes absolute summaries, overwriting any existing row for the session."""
+
+    @abstractmethod
+    def fetch_sessions(self, user_id: str, limit: int, before: Optional[Tuple[str, str]] = None) -> List[dict]:
+        """
+        A user's sessions, most recently active first.
+        `before` is the (last_message_at, session_id) of the last row of the previous page.
+        """
+
+    def rebuild_session_summaries(self, page_size: int = 1000) -> int:
+        """Backfills chat_sessions from the full chat_history. Returns the number of sessions."""
+        summaries = {}
+        after = None
+        while True:
+            page = self.fetch_chat_history_page(after, page_size)
+            if not page:
+                break
+            for delta in summarize_chat_rows(page):
+                existing = summaries.get(delta["session_id"])
+                if existing:
+                    delta["message_count"] += existing["message_count"]
+                summaries[delta["session_id"]] = delta
+            after = (page[-1]["created_at"], page[-1]["id"])
+        self.replace_session_summaries(list(summaries.values()))
+        return len(summaries)
+
+    # --- mood_logs ---
+    @abstractmethod
+    def insert_mood_logs(self, rows: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def fetch_recent_moods(self, user_id: str, limit: int) -> List[dict]:
+        """Latest `limit` mood rows of a user, newest first."""
+
+    @abstractmethod
+    def fetch_mood_logs_page(self, after: Optional[Tuple[str, object]], limit: int, start: Optional[str] = None) -> List[dict]:
+        """
+        Keyset scan over all of mood_logs in (created_at, id) order, like
+        fetch_chat_history_page, optionally limited to created_at >= start.
+        """
+
+    @abstractmethod
+    def fetch_user_mood_logs_page(self, user_id: str, start: str, end: str,
+                                  after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        """
+        Keyset scan over one user's mood_logs with start <= created_at < end, in
+        (created_at, id) order. Returns only id, emotion, intensity and created_at.
+        """
+
+    # --- mood_daily_rollups (per-user, per-UTC-day aggregates of mood_logs) ---
+    @abstractmethod
+    def upsert_mood_rollups(self, deltas: List[dict]) -> None:
+        """Adds valence_sum / log_count / intensity_sum deltas onto the (user_id, day) rows."""
+
+    @abstractmethod
+    def replace_mood_rollups(self, rollups: List[dict]) -> None:
+        """Writes absolute rollups, overwriting existing (user_id, day) rows."""
+
+    @abstractmethod
+    def fetch_mood_rollups(self, user_id: str, since_day: str) -> List[dict]:
+        """A user's rollup rows with day >= since_day ("YYYY-MM-DD"), oldest first."""
+
+    @abstractmethod
+    def fetch_mood_logs_since(self, user_id: str, since: str) -> List[dict]:
+        """All mood rows of a user created at or after `since`, oldest first."""
+
+    # --- user_assessments ---
+    @abstractmethod
+    def insert_assessment(self, record: dict) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def fetch_latest_assessment(self, user_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def update_assessment_summary(self, assessment_id: str, llm_summary: str) -> None:
+        """Fills in llm_summary once the background summary job finishes."""
+
+    @abstractmethod
+    def fetch_assessments_page(self, start: str, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        """
+        Keyset scan over all user_assessments with created_at >= start, in
+        (created_at, id) order. Returns id, user_id, risk_prediction, risk_confidence, created_at.
+        """
+
+    # --- cohort_daily_aggregates (population-level analytics) ---
+    @abstractmethod
+    def upsert_cohort_aggregates(self, rows: List[dict]) -> None:
+        """Writes {"day", "payload"} rows, replacing existing days."""
+
+    @abstractmethod
+    def fetch_cohort_aggregates(self, start_day: str, end_day: str) -> List[dict]:
+        """Rows with start_day <= day <= end_day, oldest first."""
+
+    # --- errors ---
+    @abstractmethod
+    def is_rejected(self, error: Exception) -> bool:
+        """
+        True if a write failed because the DB refused the rows themselves (a
+        constraint or an invalid value), so retrying them can never succeed.
+        False for connection problems, timeouts and server errors.
+        """
@@ -0,0 +1,405 @@
+import json
+import os
+import queue
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from .base import Repository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_history_session ON chat_history (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_history_user ON chat_history (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history (created_at, id);
+
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    preview TEXT,
+    last_message_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user ON chat_sessions (user_id, last_message_at, session_id);
+
+CREATE TABLE IF NOT EXISTS mood_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    emotion TEXT,
+    note TEXT,
+    intensity REAL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mood_logs_user ON mood_logs (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_mood_logs_created ON mood_logs (created_at, id);
+
+CREATE TABLE IF NOT EXISTS mood_daily_rollups (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    valence_sum REAL NOT NULL DEFAULT 0,
+    log_count INTEGER NOT NULL DEFAULT 0,
+    intensity_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS user_assessments (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    form_data TEXT,
+    risk_prediction TEXT,
+    risk_confidence REAL,
+    top_features TEXT,
+    llm_summary TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_user_assessments_user ON user_assessments (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_user_assessments_created ON user_assessments (created_at, id);
+
+CREATE TABLE IF NOT EXISTS cohort_daily_aggregates (
+    day TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+# Columns stored as JSON text (jsonb in Supabase)
+JSON_COLUMNS = ("form_data", "top_features", "payload")
+
+
+def _ts(value: Optional[str] = None) -> str:
+    """
+    Normalises a timestamp to fixed-width UTC ISO text so that string ordering in
+    SQLite matches chronological ordering. Defaults to now.
+    """
+    if value is None:
+        dt = datetime.now(timezone.utc)
+    else:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        dt = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+class SQLiteRepository(Repository):
+    """
+    Local single-box backend. Uses WAL so readers never block the writer, and a
+    small pool of connections shared across the DB worker threads.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._pool = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        conn = self._pool.get()
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _rows(self, cursor) -> List[dict]:
+        rows = []
+        for row in cursor.fetchall():
+            record = dict(row)
+            for col in JSON_COLUMNS:
+                if isinstance(record.get(col), str):
+                    record[col] = json.loads(record[col])
+            rows.append(record)
+        return rows
+
+    # --- chat_history ---
+    def insert_chat_messages(self, rows: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO chat_history (user_id, session_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(r["user_id"], r["session_id"], r["role"], r["content"], _ts(r.get("created_at"))) for r in rows]
+            )
+
+    def fetch_chat_history(self, session_id: str, limit: int, before: Optional[Tuple[str, object]] = None) -> List[dict]:
+        with self._conn() as conn:
+            if before and before[1] is not None:
+                cur = conn.execute(
+                    "SELECT * FROM chat_history WHERE session_id = ? AND (created_at, id) < (?, ?) "
+                    "ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (session_id, _ts(before[0]), int(before[1]), limit)
+                )
+            elif before:
+                cur = conn.execute(
+                    "SELECT * FROM chat_history WHERE session_id = ? AND created_at < ? "
+                    "ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (session_id, _ts(before[0]), limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT * FROM chat_history WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (session_id, limit)
+                )
+            return self._rows(cur)
+
+    def fetch_user_messages(self, user_id: str, limit: int) -> List[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT session_id, content, created_at FROM chat_history WHERE user_id = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (user_id, limit)
+            )
+            return self._rows(cur)
+
+    def fetch_chat_history_page(self, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        with self._conn() as conn:
+            if after:
+                cur = conn.execute(
+                    "SELECT id, user_id, session_id, content, created_at FROM chat_history "
+                    "WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?",
+                    (_ts(after[0]), int(after[1]), limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT id, user_id, session_id, content, created_at FROM chat_history "
+                    "ORDER BY created_at, id LIMIT ?",
+                    (limit,)
+                )
+            return self._rows(cur)
+
+    # --- chat_sessions ---
+    def upsert_session_activity(self, deltas: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO chat_sessions (session_id, user_id, preview, last_message_at, message_count) "
+                "VALUES (:session_id, :user_id, :preview, :last_message_at, :message_count) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                # A late or retried batch must not move the session back to an older message
+                # (timestamps are fixed-width text, so max() is chronological)
+                "preview = CASE WHEN excluded.last_message_at >= chat_sessions.last_message_at "
+                "THEN excluded.preview ELSE chat_sessions.preview END, "
+                "last_message_at = max(chat_sessions.last_message_at, excluded.last_message_at), "
+                "message_count = chat_sessions.message_count + excluded.message_count",
+                [{**d, "last_message_at": _ts(d["last_message_at"])} for d in deltas]
+            )
+
+    def replace_session_summaries(self, summaries: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, user_id, preview, last_message_at, message_count) "
+                "VALUES (:session_id, :user_id, :preview, :last_message_at, :message_count)",
+                [{**s, "last_message_at": _ts(s["last_message_at"])} for s in summaries]
+            )
+
+    def rebuild_session_summaries(self, page_size: int = 1000) -> int:
+        # Everything is local, so one aggregate query beats paging rows through Python
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, user_id, preview, last_message_at, message_count) "
+                "SELECT h.session_id, h.user_id, "
+                "(SELECT content FROM chat_history l WHERE l.session_id = h.session_id "
+                " ORDER BY created_at DESC, id DESC LIMIT 1), "
+                "MAX(h.created_at), COUNT(*) "
+                "FROM chat_history h GROUP BY h.session_id"
+            )
+            return conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+
+    def fetch_sessions(self, user_id: str, limit: int, before: Optional[Tuple[str, str]] = None) -> List[dict]:
+        with self._conn() as conn:
+            if before:
+                cur = conn.execute(
+                    "SELECT session_id, preview, last_message_at, message_count FROM chat_sessions "
+                    "WHERE user_id = ? AND (last_message_at, session_id) < (?, ?) "
+                    "ORDER BY last_message_at DESC, session_id DESC LIMIT ?",
+                    (user_id, _ts(before[0]), before[1], limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT session_id, preview, last_message_at, message_count FROM chat_sessions "
+                    "WHERE user_id = ? ORDER BY last_message_at DESC, session_id DESC LIMIT ?",
+                    (user_id, limit)
+                )
+            return self._rows(cur)
+
+    # --- mood_logs ---
+    def insert_mood_logs(self, rows: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO mood_logs (user_id, emotion, note, intensity, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(r["user_id"], r.get("emotion"), r.get("note"), r.get("intensity"), _ts(r.get("created_at"))) for r in rows]
+            )
+
+    def fetch_recent_moods(self, user_id: str, limit: int) -> List[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT emotion, created_at FROM mood_logs WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                (user_id, limit)
+            )
+            return self._rows(cur)
+
+    def fetch_mood_logs_page(self, after: Optional[Tuple[str, object]], limit: int, start: Optional[str] = None) -> List[dict]:
+        with self._conn() as conn:
+            if after:
+                cur = conn.execute(
+                    "SELECT id, user_id, emotion, intensity, created_at FROM mood_logs "
+                    "WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?",
+                    (_ts(after[0]), int(after[1]), limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT id, user_id, emotion, intensity, created_at FROM mood_logs "
+                    "WHERE created_at >= ? ORDER BY created_at, id LIMIT ?",
+                    (_ts(start) if start else "", limit)
+                )
+            return self._rows(cur)
+
+    def fetch_user_mood_logs_page(self, user_id: str, start: str, end: str,
+                                  after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        with self._conn() as conn:
+            if after:
+                cur = conn.execute(
+                    "SELECT id, emotion, intensity, created_at FROM mood_logs "
+                    "WHERE user_id = ? AND created_at >= ? AND created_at < ? AND (created_at, id) > (?, ?) "
+                    "ORDER BY created_at, id LIMIT ?",
+                    (user_id, _ts(start), _ts(end), _ts(after[0]), int(after[1]), limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT id, emotion, intensity, created_at FROM mood_logs "
+                    "WHERE user_id = ? AND created_at >= ? AND created_at < ? "
+                    "ORDER BY created_at, id LIMIT ?",
+                    (user_id, _ts(start), _ts(end), limit)
+                )
+            return self._rows(cur)
+
+    # --- mood_daily_rollups ---
+    def upsert_mood_rollups(self, deltas: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO mood_daily_rollups (user_id, day, valence_sum, log_count, intensity_sum) "
+                "VALUES (:user_id, :day, :valence_sum, :log_count, :intensity_sum) "
+                "ON CONFLICT(user_id, day) DO UPDATE SET "
+                "valence_sum = mood_daily_rollups.valence_sum + excluded.valence_sum, "
+                "log_count = mood_daily_rollups.log_count + excluded.log_count, "
+                "intensity_sum = mood_daily_rollups.intensity_sum + excluded.intensity_sum",
+                deltas
+            )
+
+    def replace_mood_rollups(self, rollups: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO mood_daily_rollups (user_id, day, valence_sum, log_count, intensity_sum) "
+                "VALUES (:user_id, :day, :valence_sum, :log_count, :intensity_sum)",
+                rollups
+            )
+
+    def fetch_mood_rollups(self, user_id: str, since_day: str) -> List[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT day, valence_sum, log_count, intensity_sum FROM mood_daily_rollups "
+                "WHERE user_id = ? AND day >= ? ORDER BY day",
+                (user_id, since_day)
+            )
+            return self._rows(cur)
+
+    def fetch_mood_logs_since(self, user_id: str, since: str) -> List[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT * FROM mood_logs WHERE user_id = ? AND created_at >= ? ORDER BY created_at ASC, id ASC",
+                (user_id, _ts(since))
+            )
+            return self._rows(cur)
+
+    # --- user_assessments ---
+    def insert_assessment(self, record: dict) -> List[dict]:
+        row = {
+            "id": str(uuid.uuid4()),
+            "user_id": record["user_id"],
+            "form_data": json.dumps(record.get("form_data")),
+            "risk_prediction": record.get("risk_prediction"),
+            "risk_confidence": record.get("risk_confidence"),
+            "top_features": json.dumps(record.get("top_features")),
+            "llm_summary": record.get("llm_summary"),
+            "created_at": _ts(record.get("created_at")),
+        }
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO user_assessments (id, user_id, form_data, risk_prediction, risk_confidence, "
+                "top_features, llm_summary, created_at) VALUES (:id, :user_id, :form_data, :risk_prediction, "
+                ":risk_confidence, :top_features, :llm_summary, :created_at)",
+                row
+            )
+        for col in ("form_data", "top_features"):
+            row[col] = json.loads(row[col])
+        return [row]
+
+    def fetch_latest_assessment(self, user_id: str) -> Optional[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT * FROM user_assessments WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
+                (user_id,)
+            )
+            rows = self._rows(cur)
+        return rows[0] if rows else None
+
+    def update_assessment_summary(self, assessment_id: str, llm_summary: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE user_assessments SET llm_summary = ? WHERE id = ?",
+                (llm_summary, assessment_id)
+            )
+
+    def fetch_assessments_page(self, start: str, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        with self._conn() as conn:
+            if after:
+                cur = conn.execute(
+                    "SELECT id, user_id, risk_prediction, risk_confidence, created_at FROM user_assessments "
+                    "WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?",
+                    (_ts(after[0]), after[1], limit)
+                )
+            else:
+                cur = conn.execute(
+                    "SELECT id, user_id, risk_prediction, risk_confidence, created_at FROM user_assessments "
+                    "WHERE created_at >= ? ORDER BY created_at, id LIMIT ?",
+                    (_ts(start), limit)
+                )
+            return self._rows(cur)
+
+    # --- cohort_daily_aggregates ---
+    def upsert_cohort_aggregates(self, rows: List[dict]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cohort_daily_aggregates (day, payload) VALUES (?, ?)",
+                [(r["day"], json.dumps(r["payload"])) for r in rows]
+            )
+
+    def fetch_cohort_aggregates(self, start_day: str, end_day: str) -> List[dict]:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "SELECT day, payload FROM cohort_daily_aggregates WHERE day >= ? AND day <= ? ORDER BY day",
+                (start_day, end_day)
+            )
+            return self._rows(cur)
+
+    # --- errors ---
+    def is_rejected(self, error: Exception) -> bool:
+        return isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError))
@@ -0,0 +1,203 @@
+from typing import List, Optional, Tuple
+from postgrest.exceptions import APIError
+from supabase import Client
+from .base import Repository
+
+
+def _keyset_filter(op: str, sort_col: str, tie_col: str, value, tie_value) -> str:
+    """PostgREST `or` filter for rows past (value, tie_value); op is "gt" for ascending scans, "lt" for descending."""
+    return f'{sort_col}.{op}."{value}",and({sort_col}.eq."{value}",{tie_col}.{op}."{tie_value}")'
+
+
+class SupabaseRepository(Repository):
+    """
+    Backed by the hosted Postgres tables. The summary tables are expected to be
+    created with the scripts in backend/sql/.
+    """
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    def insert_chat_messages(self, rows: List[dict]) -> None:
+        self.client.table("chat_history").insert(rows).execute()
+
+    def fetch_chat_history(self, session_id: str, limit: int, before: Optional[Tuple[str, object]] = None) -> List[dict]:
+        query = self.client.table("chat_history")\
+            .select("*")\
+            .eq("session_id", session_id)
+        if before and before[1] is not None:
+            query = query.or_(_keyset_filter("lt", "created_at", "id", *before))
+        elif before:
+            query = query.lt("created_at", before[0])
+        response = query\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def fetch_user_messages(self, user_id: str, limit: int) -> List[dict]:
+        response = self.client.table("chat_history")\
+            .select("session_id, content, created_at")\
+            .eq("user_id", user_id)\
+            .order("created_at", desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def fetch_chat_history_page(self, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        query = self.client.table("chat_history")\
+            .select("id, user_id, session_id, content, created_at")
+        if after:
+            query = query.or_(_keyset_filter("gt", "created_at", "id", *after))
+        response = query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def upsert_session_activity(self, deltas: List[dict]) -> None:
+        if not deltas:
+            return
+        # PostgREST upserts can't increment; apply_session_activity (sql/chat_sessions.sql)
+        # does the increment inside the upsert
+        self.client.rpc("apply_session_activity", {"deltas": deltas}).execute()
+
+    def replace_session_summaries(self, summaries: List[dict]) -> None:
+        for i in range(0, len(summaries), 500):
+            self.client.table("chat_sessions").upsert(summaries[i:i + 500], on_conflict="session_id").execute()
+
+    def fetch_sessions(self, user_id: str, limit: int, before: Optional[Tuple[str, str]] = None) -> List[dict]:
+        query = self.client.table("chat_sessions")\
+            .select("session_id, preview, last_message_at, message_count")\
+            .eq("user_id", user_id)
+        if before:
+            query = query.or_(_keyset_filter("lt", "last_message_at", "session_id", *before))
+        response = query\
+            .order("last_message_at", desc=True)\
+            .order("session_id", desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def insert_mood_logs(self, rows: List[dict]) -> None:
+        self.client.table("mood_logs").insert(rows).execute()
+
+    def fetch_recent_moods(self, user_id: str, limit: int) -> List[dict]:
+        response = self.client.table("mood_logs")\
+            .select("emotion, created_at")\
+            .eq("user_id", user_id)\
+            .order("created_at", desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def fetch_mood_logs_page(self, after: Optional[Tuple[str, object]], limit: int, start: Optional[str] = None) -> List[dict]:
+        query = self.client.table("mood_logs")\
+            .select("id, user_id, emotion, intensity, created_at")
+        if start:
+            query = query.gte("created_at", start)
+        if after:
+            query = query.or_(_keyset_filter("gt", "created_at", "id", *after))
+        response = query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def fetch_user_mood_logs_page(self, user_id: str, start: str, end: str,
+                                  after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        query = self.client.table("mood_logs")\
+            .select("id, emotion, intensity, created_at")\
+            .eq("user_id", user_id)\
+            .gte("created_at", start)\
+            .lt("created_at", end)
+        if after:
+            query = query.or_(_keyset_filter("gt", "created_at", "id", *after))
+        response = query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def upsert_mood_rollups(self, deltas: List[dict]) -> None:
+        if not deltas:
+            return
+        # Incremented inside the upsert by apply_mood_rollups (sql/mood_daily_rollups.sql)
+        self.client.rpc("apply_mood_rollups", {"deltas": deltas}).execute()
+
+    def replace_mood_rollups(self, rollups: List[dict]) -> None:
+        for i in range(0, len(rollups), 500):
+            self.client.table("mood_daily_rollups").upsert(rollups[i:i + 500], on_conflict="user_id,day").execute()
+
+    def fetch_mood_rollups(self, user_id: str, since_day: str) -> List[dict]:
+        response = self.client.table("mood_daily_rollups")\
+            .select("day, valence_sum, log_count, intensity_sum")\
+            .eq("user_id", user_id)\
+            .gte("day", since_day)\
+            .order("day")\
+            .execute()
+        return response.data
+
+    def fetch_mood_logs_since(self, user_id: str, since: str) -> List[dict]:
+        response = self.client.table("mood_logs")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .gte("created_at", since)\
+            .order("created_at", desc=False)\
+            .execute()
+        return response.data
+
+    def insert_assessment(self, record: dict) -> List[dict]:
+        response = self.client.table("user_assessments").insert(record).execute()
+        return response.data
+
+    def fetch_latest_assessment(self, user_id: str) -> Optional[dict]:
+        response = self.client.table("user_assessments")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            return response.data[0]
+        return None
+
+    def update_assessment_summary(self, assessment_id: str, llm_summary: str) -> None:
+        self.client.table("user_assessments")\
+            .update({"llm_summary": llm_summary})\
+            .eq("id", assessment_id)\
+            .execute()
+
+    def fetch_assessments_page(self, start: str, after: Optional[Tuple[str, object]], limit: int) -> List[dict]:
+        query = self.client.table("user_assessments")\
+            .select("id, user_id, risk_prediction, risk_confidence, created_at")\
+            .gte("created_at", start)
+        if after:
+            query = query.or_(_keyset_filter("gt", "created_at", "id", *after))
+        response = query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        return response.data
+
+    def upsert_cohort_aggregates(self, rows: List[dict]) -> None:
+        if rows:
+            self.client.table("cohort_daily_aggregates").upsert(rows, on_conflict="day").execute()
+
+    def fetch_cohort_aggregates(self, start_day: str, end_day: str) -> List[dict]:
+        response = self.client.table("cohort_daily_aggregates")\
+            .select("day, payload")\
+            .gte("day", start_day)\
+            .lte("day", end_day)\
+            .order("day")\
+            .execute()
+        return response.data
+
+    def is_rejected(self, error: Exception) -> bool:
+        # Postgres SQLSTATE classes 22 (data exception) and 23 (integrity constraint violation)
+        return isinstance(error, APIError) and str(error.code or "")[:2] in ("22", "23")
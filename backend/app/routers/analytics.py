@@ -1,116 +1,323 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
-from ..core.database import get_supabase
-from ..core.llm import llm
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+from ..core.database import get_repository, run_query
+from ..services.mood_rollups import emotion_valence, mood_day, rollup_mood_rows
+from ..services.mood_writer import mood_writer
+from ..services.dashboard_events import dashboard_events
+from ..services.mood_tracker import get_recent_moods
+from ..services.analysis_cache import analysis_cache
+from ..services.mood_trends import get_mood_trends, BUCKETS
+from ..services.cohort_analytics import CohortAggregate
+from ..core.config import settings
+from zoneinfo import ZoneInfo
+from ..core.llm_scheduler import llm_scheduler
 from langchain_core.messages import SystemMessage, HumanMessage
 
 router = APIRouter()
 
-# Emotion to Valence Mapping (1-10)
-EMOTION_VALENCE = {
-    "joy": 9, "love": 9, "admiration": 8, "optimism": 8, "caring": 8, "excitement": 9, "gratitude": 9, "pride": 8, "relief": 7,
-    "neutral": 6, "realization": 6, "surprise": 6, "curiosity": 7, "approval": 7, "desire": 6,
-    "sadness": 3, "anger": 2, "fear": 2, "disgust": 1, "grief": 1, "remorse": 2, "embarrassment": 3, "disappointment": 3, "annoyance": 3, "nervousness": 4, "confusion": 5
-}
+async def _generate_analysis(user_id: str, emotions_list: list, risk_avg: float) -> str:
+    prompt = f"""
+    Analyze these recent emotions for a user: {', '.join(emotions_list[-20:])}.
+    Average Risk Score (0-1): {risk_avg:.2f}.
+    Provide a brief, compassionate 2-sentence summary of their mental state and a gentle recommendation.
+    Address the user directly as 'you'.
+    """
+    ai_msg = await llm_scheduler.ainvoke(
+        [SystemMessage(content="You are an empathetic mental health analyst."), HumanMessage(content=prompt)],
+        priority="analytics", user_id=user_id
+    )
+    return ai_msg.content
 
-@router.get("/dashboard/{user_id}")
-async def get_dashboard_data(user_id: str):
-    supabase = get_supabase()
-    if not supabase:
-        # Return mock data if no DB
-        return {"error": "Database not connected"}
+def _stamped_by(created_at: str, watermark: str) -> bool:
+    return datetime.fromisoformat(created_at.replace('Z', '+00:00')) <= datetime.fromisoformat(watermark)
+
+def _day_label(day, days: int) -> str:
+    # Weekday names for a week, dates beyond that (so weeks don't collide)
+    return day.strftime("%a") if days <= 7 else day.strftime("%b %d")
 
-    # 1. Fetch Mood Logs (Last 7 Days)
-    seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-    
+def _day_points(label: str, valence_sum: float, intensity_sum: float, count: int):
+    """Mood (average valence) and Stress (average risk intensity, 0-1 -> 0-100) for one day; 0 if no data."""
+    mood = {"day": label, "value": round(valence_sum / count, 1) if count else 0}
+    stress = {"day": label, "level": round(intensity_sum * 100 / count, 1) if count else 0}
+    return mood, stress
+
+async def _cached_analysis(user_id: str, days: int, totals: dict) -> str:
+    """
+    LLM analysis, cached until the user's mood data changes.
+    The log count and latest active day in the window act as the watermark.
+    """
+    if not totals["count"]:
+        return "No sufficient data for analysis yet."
+    risk_avg = totals["intensity_sum"] / totals["count"]
+    watermark = (totals["count"], totals["last_day"])
+    emotions_list = list(totals["emotions"])
     try:
-        response = supabase.table("mood_logs")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .gte("created_at", seven_days_ago)\
-            .order("created_at", desc=False)\
-            .execute()
-        logs = response.data
+        return await analysis_cache.get(
+            (user_id, days), watermark, lambda: _generate_analysis(user_id, emotions_list, risk_avg)
+        )
     except Exception as e:
-        print(f"Error fetching logs: {e}")
-        logs = []
-
-    # 2. Process Mood Data (Daily Average)
-    mood_data = []
-    daily_scores = defaultdict(list)
-    
-    for log in logs:
-        dt = datetime.fromisoformat(log['created_at'].replace('Z', '+00:00'))
-        day_name = dt.strftime("%a") # Mon, Tue
-        emotion = log.get('emotion', 'neutral')
-        score = EMOTION_VALENCE.get(emotion, 5)
-        daily_scores[day_name].append(score)
-
-    # Get last 7 days explicitly
-    today = datetime.utcnow()
-    days = [(today - timedelta(days=i)).strftime("%a") for i in range(6, -1, -1)]
-    
-    final_mood_data = []
-    for day in days:
-        scores = daily_scores.get(day, [])
-        # If no data for a day, we return 0 or null to show a gap, or 5 for neutral?
-        # Let's return 0 to indicate "no data" clearly on the chart, or handle in frontend.
-        # For now, let's use 5 (Neutral) as a baseline if missing, or 0 if we want to hide it.
-        # User wants "real data", so let's use 0 if no data exists, but that might look like "terrible mood".
-        # Let's use null if possible, but recharts might need a value.
-        # Let's use 0 and handle it or just use 5 as "Unknown/Neutral".
-        # Actually, let's filter out days with no data? No, we want the x-axis to be consistent.
-        # Let's use 5 (Neutral) as the baseline for missing data to avoid alarming drops.
-        avg = sum(scores) / len(scores) if scores else 0 
-        final_mood_data.append({"day": day, "value": round(avg, 1)})
-
-    # 3. Process Stress/Risk Data (Daily Average)
-    # We'll use 'intensity' (risk score) as stress level (0-1 -> 0-100)
-    daily_stress = defaultdict(list)
-    
-    for log in logs:
-        dt = datetime.fromisoformat(log['created_at'].replace('Z', '+00:00'))
-        day_name = dt.strftime("%a") # Mon, Tue
-        risk = log.get('intensity')
-        
-        # If risk is None (old logs), treat as 0
-        if risk is None:
-            risk = 0.0
-            
-        stress_val = risk * 100 # Convert 0-1 to 0-100
-        daily_stress[day_name].append(stress_val)
+        print(f"LLM Analysis failed: {e}")
+        return "Unable to generate analysis at this moment."
 
+async def _fetch_rollups(repo, user_id: str, first_day: str) -> list:
+    try:
+        return await run_query("mood_daily_rollups.dashboard", lambda: repo.fetch_mood_rollups(user_id, first_day))
+    except Exception as e:
+        print(f"Error fetching rollups: {e}")
+        return []
+
+async def _build_dashboard(repo, user_id: str, days: int):
+    """
+    Returns the dashboard payload plus the running totals it was built from.
+    The payload's `watermark` is the time it was taken: it covers exactly the
+    moods stamped at or before it, so later events add on top without overlap.
+    """
+    # 1. Fetch the pre-aggregated daily rollups (at most `days` small rows), plus the
+    # moods still queued for writing; no batch commits between the two reads
+    today = datetime.now(timezone.utc).date()
+    window = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
+
+    rollups, pending = await mood_writer.read_with_pending(
+        lambda: _fetch_rollups(repo, user_id, window[0].isoformat()), "user_id", user_id
+    )
+    watermark = datetime.now(timezone.utc).isoformat()
+    by_day = {str(r['day']): dict(r) for r in rollups}
+    for bucket in rollup_mood_rows(pending).values():
+        r = by_day.setdefault(bucket['day'], {"valence_sum": 0.0, "intensity_sum": 0.0, "log_count": 0})
+        r['valence_sum'] += bucket['valence_sum']
+        r['intensity_sum'] += bucket['intensity_sum']
+        r['log_count'] += bucket['log_count']
+
+    # 2. Mood and Stress per day. Days with no data are 0 so the x-axis stays consistent.
+    final_mood_data = []
     stress_data = []
-    for day in days:
-        vals = daily_stress.get(day, [])
-        # If no data for a day, return 0
-        avg = sum(vals) / len(vals) if vals else 0
-        stress_data.append({"day": day, "level": round(avg, 1)})
+    totals = {"count": 0, "intensity_sum": 0.0, "last_day": None, "emotions": [], "today": None}
+    for day in window:
+        r = by_day.get(day.isoformat()) or {"valence_sum": 0.0, "intensity_sum": 0.0, "log_count": 0}
+        if r['log_count']:
+            totals["count"] += r['log_count']
+            totals["intensity_sum"] += r['intensity_sum']
+            totals["last_day"] = day.isoformat()
+        mood, stress = _day_points(_day_label(day, days), r['valence_sum'], r['intensity_sum'], r['log_count'])
+        final_mood_data.append(mood)
+        stress_data.append(stress)
+    today_row = by_day.get(today.isoformat())
+    totals["today"] = {
+        "day": today.isoformat(),
+        "valence_sum": today_row['valence_sum'] if today_row else 0.0,
+        "intensity_sum": today_row['intensity_sum'] if today_row else 0.0,
+        "log_count": today_row['log_count'] if today_row else 0,
+    }
+
+    # 3. Latest emotions come from the recent-moods hot tier, not a range scan,
+    # keeping only those logged inside the window and up to the watermark
+    recent = await get_recent_moods(user_id, 20) if totals["count"] else []
+    window_start = window[0].isoformat()
+    totals["emotions"] = [
+        m.get('emotion') for m in reversed(recent)
+        if m.get('emotion') and m.get('created_at') and mood_day(m['created_at']) >= window_start
+        and _stamped_by(m['created_at'], watermark)
+    ]
 
     # 4. Generate Analysis with LLM
-    analysis_text = "No sufficient data for analysis yet."
-    if logs:
-        emotions_list = [l.get('emotion') for l in logs]
-        risk_avg = sum([l.get('intensity') or 0 for l in logs]) / len(logs)
-        
-        prompt = f"""
-        Analyze these recent emotions for a user: {', '.join(emotions_list[-20:])}.
-        Average Risk Score (0-1): {risk_avg:.2f}.
-        Provide a brief, compassionate 2-sentence summary of their mental state and a gentle recommendation.
-        Address the user directly as 'you'.
-        """
-        try:
-            ai_msg = await llm.ainvoke([SystemMessage(content="You are an empathetic mental health analyst."), HumanMessage(content=prompt)])
-            analysis_text = ai_msg.content
-        except Exception as e:
-            print(f"LLM Analysis failed: {e}")
-            analysis_text = "Unable to generate analysis at this moment."
+    analysis_text = await _cached_analysis(user_id, days, totals)
 
-    return {
+    payload = {
         "mood_data": final_mood_data,
         "stress_data": stress_data,
         "analysis": analysis_text,
-        "recent_emotions": [l.get('emotion') for l in logs[-5:]]
+        "recent_emotions": totals["emotions"][-5:],
+        "watermark": watermark
     }
+    return payload, totals
+
+@router.get("/dashboard/{user_id}")
+async def get_dashboard_data(user_id: str, days: int = 7):
+    repo = get_repository()
+    if not repo:
+        # Return mock data if no DB
+        return {"error": "Database not connected"}
+
+    days = max(1, min(days, 366))
+    payload, _ = await _build_dashboard(repo, user_id, days)
+    return payload
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+@router.websocket("/ws/dashboard/{user_id}")
+async def dashboard_updates(websocket: WebSocket, user_id: str):
+    """
+    Live 7-day dashboard. Sends a "snapshot" frame (same shape as
+    /dashboard/{user_id}), then a "delta" frame with the updated day bucket,
+    recent emotions and the mood's created_at whenever log_mood records a mood
+    for this user, and an "analysis" frame once a refreshed LLM analysis is
+    ready. Moods stamped at or before the snapshot's watermark are already in
+    it and get no delta.
+    """
+    await websocket.accept()
+    repo = get_repository()
+    if not repo:
+        await websocket.send_text(json.dumps({"type": "error", "error": "Database not connected"}))
+        await websocket.close()
+        return
+
+    days = 7
+    # Subscribe before taking the snapshot so no mood logged in between is missed;
+    # events the snapshot already covers are skipped by its watermark
+    queue = dashboard_events.subscribe(user_id)
+    send_lock = asyncio.Lock()
+    background = set()
+
+    async def send(frame: dict):
+        async with send_lock:
+            await websocket.send_text(json.dumps(frame))
+
+    async def push_analysis_when_ready(refresh):
+        # Shielded: this dashboard going away must not cancel the shared refresh
+        await asyncio.shield(refresh)
+        payload["analysis"] = await _cached_analysis(user_id, days, totals)
+        await send({"type": "analysis", "analysis": payload["analysis"]})
+
+    receiver = asyncio.create_task(_wait_for_disconnect(websocket))
+    watched_refresh = None
+    try:
+        payload, totals = await _build_dashboard(repo, user_id, days)
+        await send({"type": "snapshot", **payload})
+
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                break
+            event = getter.result()
+            if _stamped_by(event["created_at"], payload["watermark"]):
+                # Logged before the snapshot was taken, so already counted in it
+                continue
+
+            # Fold the new mood into today's bucket and the window totals
+            day = mood_day(event["created_at"])
+            today = totals["today"]
+            if today["day"] != day:
+                today = totals["today"] = {"day": day, "valence_sum": 0.0, "intensity_sum": 0.0, "log_count": 0}
+            valence = emotion_valence(event.get("emotion"))
+            intensity = event.get("intensity") or 0.0
+            today["valence_sum"] += valence
+            today["intensity_sum"] += intensity
+            today["log_count"] += 1
+            totals["count"] += 1
+            totals["intensity_sum"] += intensity
+            totals["last_day"] = day
+            if event.get("emotion"):
+                totals["emotions"] = (totals["emotions"] + [event["emotion"]])[-20:]
+
+            label = _day_label(datetime.fromisoformat(day), days)
+            mood, stress = _day_points(label, today["valence_sum"], today["intensity_sum"], today["log_count"])
+            await send({
+                "type": "delta",
+                "mood_point": mood,
+                "stress_point": stress,
+                "recent_emotions": totals["emotions"][-5:],
+                "created_at": event["created_at"]
+            })
+
+            # Returns the cached text at once and schedules a background refresh
+            # (rate-limited per user by the cache); push the new analysis when it lands.
+            analysis = await _cached_analysis(user_id, days, totals)
+            refresh = analysis_cache.pending_refresh((user_id, days))
+            if refresh is None and analysis != payload["analysis"]:
+                # First analysis for this user (cache miss) was generated inline
+                payload["analysis"] = analysis
+                await send({"type": "analysis", "analysis": analysis})
+            elif refresh is not None and refresh is not watched_refresh:
+                # One watcher per refresh, however many moods arrive while it is pending
+                watched_refresh = refresh
+                task = asyncio.create_task(push_analysis_when_ready(refresh))
+                background.add(task)
+                task.add_done_callback(background.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        dashboard_events.unsubscribe(user_id, queue)
+        receiver.cancel()
+        for task in background:
+            task.cancel()
+
+
+def _parse_bound(value: str, tz: ZoneInfo) -> datetime:
+    """ISO date or datetime; naive values are taken as local time in `tz`."""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt.replace(tzinfo=tz) if dt.tzinfo is None else dt
+
+@router.get("/trends/{user_id}")
+async def get_trends(user_id: str, start: str = None, end: str = None, bucket: str = "day",
+                     tz: str = "UTC", max_points: int = None):
+    """
+    Mood/stress trend over any range at hour, day, week or month resolution.
+    Defaults to the last 30 days. `tz` is an IANA zone name used for bucket
+    boundaries; long ranges are downsampled to at most `max_points` points.
+    """
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(BUCKETS)}")
+    try:
+        zone = ZoneInfo(tz)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone '{tz}'")
+    try:
+        end_dt = _parse_bound(end, zone) if end else datetime.now(timezone.utc)
+        start_dt = _parse_bound(start, zone) if start else end_dt - timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be ISO dates or datetimes")
+    if start_dt >= end_dt:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    max_points = max(1, min(max_points or settings.ANALYTICS_MAX_POINTS, settings.ANALYTICS_MAX_POINTS))
+    try:
+        points = await get_mood_trends(user_id, start_dt, end_dt, bucket, zone, max_points)
+    except Exception as e:
+        print(f"Error computing trends: {e}")
+        raise HTTPException(status_code=500, detail="Unable to compute trends")
+
+    return {
+        "bucket": bucket,
+        "timezone": tz,
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat(),
+        "points": points
+    }
+
+@router.get("/cohort")
+async def get_cohort_analytics(days: int = 30):
+    """
+    Population-level view across all users, read from the precomputed
+    cohort_daily_aggregates (see app.jobs.cohort_analytics): a per-day series
+    plus totals for the whole window.
+    """
+    repo = get_repository()
+    if not repo:
+        return {"error": "Database not connected"}
+
+    days = max(1, min(days, 366))
+    today = datetime.now(timezone.utc).date()
+    start_day = (today - timedelta(days=days - 1)).isoformat()
+    try:
+        rows = await run_query("cohort_daily_aggregates.fetch", lambda: repo.fetch_cohort_aggregates(start_day, today.isoformat()))
+    except Exception as e:
+        print(f"Error fetching cohort aggregates: {e}")
+        raise HTTPException(status_code=500, detail="Unable to load cohort analytics")
+
+    total = CohortAggregate()
+    series = []
+    for r in rows:
+        agg = CohortAggregate.from_dict(r["payload"])
+        total.merge(agg)
+        series.append({"day": str(r["day"]), "active_users": agg.active_users, **agg.summary()})
+
+    return {"start": start_day, "end": today.isoformat(), "series": series, "totals": total.summary()}
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from langchain_core.messages import SystemMessage
 from ..services.ml_service import ml_service, set_user_risk_profile
-from ..core.llm import llm
 from ..services.user_service import save_user_assessment, get_latest_assessment
+from ..services.assessment_summary import assessment_summaries, FALLBACK_SUMMARY
+from ..services.assessment_cache import assessment_cache
+from ..core.executors import get_executor
 
 router = APIRouter()
 
@@ -64,82 +65,73 @@ async def submit_assessment(form: WellnessForm):
         'Family History of Depression': form.family_history_of_depression
     }
 
-    result = ml_service.predict_and_explain(ml_input)
-    
-    if "error" in result:
-        raise HTTPException(status_code=500, detail=result["error"])
-    
-    # --- LLM Summarization Step ---
+    # Unchanged resubmissions reuse the prediction, SHAP features and summary
     try:
-        pred = result.get("prediction", "Unknown")
-        top_features = result.get("top_features", [])
-        
-        # Helper to extract meaningful value for the feature
-        def get_feature_context(feature_name, inputs):
-            # Clean name
-            clean_name = feature_name.replace('encoder__', '').replace('remainder__', '')
-            
-            # Case 1: One-Hot Encoded (e.g., "Employment Status_Unemployed")
-            if '_' in clean_name:
-                # Split by last underscore to separate category and value
-                parts = clean_name.rsplit('_', 1)
-                if len(parts) == 2:
-                    category, value = parts
-                    return f"{category}: {value}"
-            
-            # Case 2: Numerical/Direct (e.g., "Age", "Income")
-            # Try to find exact match in inputs
-            if clean_name in inputs:
-                return f"{clean_name}: {inputs[clean_name]}"
-            
-            # Fallback
-            return clean_name.replace('_', ' ')
-
-        # Format features with values for the prompt
-        features_context = []
-        for f in top_features:
-            ctx = get_feature_context(f['feature'], ml_input)
-            features_context.append(f"{ctx} (Impact: {'High' if abs(f['shap_value']) > 0.1 else 'Moderate'})")
-            
-        features_str = "\n".join([f"- {fc}" for fc in features_context])
+        # Loading and hashing new artifacts is blocking file I/O
+        await get_executor("models").run(ml_service.reload_if_changed)
+    except TimeoutError:
+        print("ML artifact reload check timed out; using the loaded artifacts")
+    cache_key = assessment_cache.key_for(ml_input, ml_service.artifacts_version)
+    cached = assessment_cache.get(cache_key)
+    if cached:
+        result = cached["result"]
+        summary = cached["summary"]
+    else:
+        try:
+            # Model + SHAP are CPU-bound; run them on the CPU-model lane
+            result = await get_executor("models").run(ml_service.predict_and_explain, ml_input)
+        except TimeoutError:
+            raise HTTPException(status_code=503, detail="Assessment is taking too long, please try again")
         
-        prompt = (
-            "You are a warm, insightful wellness companion. A user just finished a health check-in. "
-            "Based on the analysis below, write 3-4 personalized, non-judgmental observations to help them reflect.\n\n"
-            f"Analysis Data:\n"
-            f"- Risk Level: {pred}\n"
-            f"- Top Influencing Factors:\n{features_str}\n\n"
-            "Guidelines:\n"
-            "1. **Be Direct but Kind**: Address the factors honestly. If they are sedentary, say 'We noticed physical activity is currently low, which can impact mood.' Don't sugarcoat or hallucinate positive traits not present in the data.\n"
-            "2. **Connect the Dots**: Briefly mention *why* a factor matters (e.g., 'Work stress can often drain energy needed for other things').\n"
-            "3. **Future Focus**: End each point with a tiny, hopeful look forward (e.g., 'Small steps here can make a big difference').\n"
-            "4. **No Jargon**: No 'SHAP', 'algorithms', 'features', 'encoders'.\n"
-            "5. **Format**: 3-4 bullet points. Start directly with the bullets."
-        )
-        
-        response = await llm.ainvoke([SystemMessage(content=prompt)])
-        llm_analysis = response.content
-        
-        # Add to result
-        result["llm_analysis"] = llm_analysis
-        
-    except Exception as e:
-        print(f"LLM summarization failed: {e}")
-        result["llm_analysis"] = "Thank you for sharing. We'll use this to better support you."
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        assessment_cache.put(cache_key, result)
+        summary = None
 
     # Store result in memory for the chat agent to access
-    # IMPORTANT: Include form_data so the agent has the full context immediately
+    # IMPORTANT: Include form_data so the agent has the full context immediately.
+    # Without a cached summary, llm_analysis is filled in by the background summary job.
     result_with_data = result.copy()
     result_with_data["form_data"] = form.dict()
+    result_with_data["llm_analysis"] = summary or ""
     set_user_risk_profile(form.user_id, result_with_data)
     
-    # Persist to Database
-    await save_user_assessment(form.user_id, {
+    # Persist to Database (the summary is added to this row when it's ready)
+    saved = await save_user_assessment(form.user_id, {
         "form_data": form.dict(),
         "prediction": result.get("prediction"),
         "confidence": result.get("confidence"),
         "top_features": result.get("top_features"),
-        "llm_analysis": result.get("llm_analysis")
+        "llm_analysis": summary
     })
-    
+    assessment_id = saved[0].get("id") if saved else None
+
+    # --- LLM Summarization Step (background; poll /assessment/summary/{user_id}) ---
+    if summary:
+        assessment_summaries.record_ready(form.user_id, assessment_id, summary)
+    else:
+        assessment_summaries.start(form.user_id, assessment_id, result, ml_input, cache_key)
+
+    result["assessment_id"] = assessment_id
+    result["llm_analysis"] = summary
+    result["summary_status"] = "ready" if summary else "pending"
     return result
+
+@router.get("/assessment/summary/{user_id}")
+async def get_assessment_summary(user_id: str):
+    job = assessment_summaries.status(user_id)
+    if job:
+        return job
+
+    # Not tracked by this process (restart, or submitted elsewhere): use the stored row.
+    # No job will fill in a missing summary any more, so report it as failed with the fallback.
+    assessment = await get_latest_assessment(user_id)
+    if not assessment:
+        return {"assessment_id": None, "status": "none", "summary": None}
+    if not assessment.get("llm_summary"):
+        return {"assessment_id": assessment.get("id"), "status": "failed", "summary": FALLBACK_SUMMARY}
+    return {
+        "assessment_id": assessment.get("id"),
+        "status": "ready",
+        "summary": assessment.get("llm_summary")
+    }
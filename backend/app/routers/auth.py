@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from ..core.database import get_supabase
+from ..core.database import get_supabase, run_query
 
 router = APIRouter()
 
@@ -20,7 +20,7 @@ async def signup(request: SignupRequest):
         raise HTTPException(status_code=503, detail="Database connection unavailable")
     
     try:
-        response = supabase.auth.sign_up({
+        response = await run_query("auth.sign_up", lambda: supabase.auth.sign_up({
             "email": request.email,
             "password": request.password,
             "options": {
@@ -28,7 +28,7 @@ async def signup(request: SignupRequest):
                     "full_name": request.full_name
                 }
             }
-        })
+        }))
         return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -40,10 +40,10 @@ async def login(request: LoginRequest):
         raise HTTPException(status_code=503, detail="Database connection unavailable")
 
     try:
-        response = supabase.auth.sign_in_with_password({
+        response = await run_query("auth.sign_in", lambda: supabase.auth.sign_in_with_password({
             "email": request.email,
             "password": request.password
-        })
+        }))
         return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -57,7 +57,7 @@ async def anonymous_login():
 
     try:
         # Note: Anonymous sign-ins must be enabled in Supabase Dashboard
-        response = supabase.auth.sign_in_anonymously()
+        response = await run_query("auth.sign_in_anonymously", supabase.auth.sign_in_anonymously)
         return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,21 +1,36 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage
 import json
-import asyncio
+import time
 from ..graph.workflow import app_workflow
-from ..services.history_service import fetch_chat_history, save_chat_message, fetch_user_sessions
+from ..services.history_service import fetch_chat_history, fetch_chat_history_page, save_chat_message, fetch_user_sessions
 from ..services.memory_service import memory_service
-from ..core.llm import llm
+from ..services.memory_ingest import memory_ingest
+from ..services.chat_writer import chat_writer
+from ..services.context_window import conversation_window, apply_compaction
+from ..services.session_store import session_store
+from ..services.fast_path import fast_path
+from ..services.starter_pool import starter_pool, clean_starter, DEFAULT_STARTER
+from ..core.llm_scheduler import llm_scheduler
+from ..core.config import settings
 
 router = APIRouter()
 
 @router.post("/chat/starter/{user_id}")
 async def get_starter_message(user_id: str):
+    # 0. Precomputed starter (filled when a session ends or memories change)
+    starter = starter_pool.take(user_id)
+    if starter:
+        return {"message": starter}
+
+    # Miss: generate on demand, and fill the pool for next time
+    starter_pool.schedule_refresh(user_id)
+
     # 1. Try to get a random memory
     memory = await memory_service.get_random_memory(user_id)
     
     if not memory:
-        return {"message": "Hi there! How are you feeling today?"}
+        return {"message": DEFAULT_STARTER}
         
     # 2. Generate a personalized starter
     prompt = f"""
@@ -25,79 +40,146 @@ async def get_starter_message(user_id: str):
     Keep it under 20 words.
     """
     try:
-        response = await llm.ainvoke([
+        response = await llm_scheduler.ainvoke([
             SystemMessage(content="You are a supportive friend."),
             HumanMessage(content=prompt),
-        ])
-
-        message = response.content
-
-        # Remove surrounding single or double quotes if present
-        if (message.startswith('"') and message.endswith('"')) or (
-            message.startswith("'") and message.endswith("'")
-        ):
-            message = message[1:-1]
+        ], priority="chat", user_id=user_id)
 
-        return {"message": message}
+        return {"message": clean_starter(response.content)}
 
     except Exception as e:
         print(f"Error generating starter: {e}")
-        return {"message": "Hi there! How are you feeling today?"}
+        return {"message": DEFAULT_STARTER}
 
 
 @router.get("/chat/sessions/{user_id}")
-async def get_sessions(user_id: str):
-    return await fetch_user_sessions(user_id)
+async def get_sessions(user_id: str, limit: int = 50, before: str = None, before_id: str = None):
+    return await fetch_user_sessions(user_id, limit=limit, before=before, before_id=before_id)
 
 @router.get("/chat/history/{session_id}")
-async def get_history(session_id: str):
-    return await fetch_chat_history(session_id)
+async def get_history(session_id: str, limit: int = 50, before: str = None, before_id: str = None):
+    return await fetch_chat_history(session_id, limit=limit, before=before, before_id=before_id)
+
+def _history_item(r: dict) -> dict:
+    return {
+        "role": "model" if r['role'] == 'bot' else "user", # Normalize role
+        "content": r['content'],
+        "timestamp": r['created_at']
+    }
+
+def _to_langchain(r: dict):
+    if r['role'] == 'user':
+        return HumanMessage(content=r['content'])
+    return AIMessage(content=r['content'])
+
+def _parse_control_frame(data: str):
+    """
+    Client frames are plain chat text, except JSON control frames such as
+    {"type": "load_history", "cursor": {...}}. Returns the frame or None.
+    """
+    if not data.startswith("{"):
+        return None
+    try:
+        frame = json.loads(data)
+    except ValueError:
+        return None
+    if isinstance(frame, dict) and frame.get("type") == "load_history":
+        return frame
+    return None
 
 @router.websocket("/ws/chat/{client_id}/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str, session_id: str):
     await websocket.accept()
     
-    # 1. Load History from Supabase for this SESSION
-    history_records = await fetch_chat_history(session_id)
-    history_messages = []
-    
-    # Send history payload
-    if history_records:
-        # Convert datetime objects to string
-        history_data = []
-        for r in history_records:
-            history_data.append({
-                "role": "model" if r['role'] == 'bot' else "user", # Normalize role
-                "content": r['content'],
-                "timestamp": r['created_at']
-            })
-            
-            # Rebuild LangChain state
-            if r['role'] == 'user':
-                history_messages.append(HumanMessage(content=r['content']))
-            else:
-                history_messages.append(AIMessage(content=r['content']))
+    # A reconnect resumes the cached state (graph fields included) without touching the DB
+    resumed = session_store.get(session_id, client_id)
+    if resumed:
+        page = {"messages": resumed["page"], "cursor": resumed["cursor"]}
+    else:
+        page = await fetch_chat_history_page(session_id, settings.HISTORY_PAGE_SIZE)
 
+    # 1. Send only the newest page of this SESSION's history; the client asks for
+    # older pages with a {"type": "load_history", "cursor": ...} frame.
+    if page["messages"]:
         await websocket.send_text(json.dumps({
             "type": "history",
-            "data": history_data
+            "data": [_history_item(r) for r in page["messages"]],
+            "cursor": page["cursor"]
         }))
+
+    if resumed:
+        state = resumed["state"]
+    else:
+        # Rebuild LangChain state from just the tail the model needs
+        context_records = page["messages"]
+        missing = settings.HISTORY_CONTEXT_MESSAGES - len(context_records)
+        if missing > 0 and page["cursor"]:
+            older = await fetch_chat_history(session_id, missing, page["cursor"]["before"], page["cursor"]["before_id"])
+            context_records = older + context_records
+        history_messages = [_to_langchain(r) for r in context_records[-settings.HISTORY_CONTEXT_MESSAGES:]]
+        
+        # Initialize state with loaded history (and the session's rolling summary, if cached)
+        state = {
+            "messages": history_messages,
+            "user_id": client_id,
+            "conversation_summary": conversation_window.summary_for(session_id)
+        }
+        session_store.put(session_id, client_id, state, page["messages"], page["cursor"])
     
-    # Initialize state with loaded history
-    state = {"messages": history_messages, "user_id": client_id}
-    
+    # Set from saving the user message until the turn is recorded in session_store
+    turn_in_progress = False
+    # Background compaction started after the previous reply
+    compaction = None
     try:
         while True:
             data = await websocket.receive_text()
+
+            frame = _parse_control_frame(data)
+            if frame:
+                cursor = frame.get("cursor") or {}
+                if cursor.get("before"):
+                    older = await fetch_chat_history_page(
+                        session_id, settings.HISTORY_PAGE_SIZE, cursor["before"], cursor.get("before_id")
+                    )
+                else:
+                    older = {"messages": [], "cursor": None}
+                await websocket.send_text(json.dumps({
+                    "type": "history_page",
+                    "data": [_history_item(r) for r in older["messages"]],
+                    "cursor": older["cursor"]
+                }))
+                continue
             
             # 2. Save User Message
-            await save_chat_message(client_id, session_id, "user", data)
+            turn_in_progress = True
+            user_sent_at = await save_chat_message(client_id, session_id, "user", data)
+            
+            if compaction is not None:
+                # Usually finished while the user was typing
+                result = await compaction
+                compaction = None
+                messages = apply_compaction(state["messages"], result)
+                if messages is not None:
+                    state["messages"], state["conversation_summary"] = messages, result[2]
             
             # Update state with user message
             state["messages"].append(HumanMessage(content=data))
             
-            # Run the graph
-            result = await app_workflow.ainvoke(state)
+            # Run the graph, forwarding the generator's tokens as they arrive.
+            # Only streamed chunks are sent; the node's final AIMessage is not.
+            turn_started = time.perf_counter()
+            result = state
+            async for mode, payload in app_workflow.astream(state, stream_mode=["messages", "values"]):
+                if mode == "values":
+                    result = payload
+                    continue
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "generator" and isinstance(chunk, AIMessageChunk) and chunk.content:
+                    await websocket.send_text(json.dumps({
+                        "type": "delta",
+                        "role": "model",
+                        "content": chunk.content
+                    }))
             
             # Update state
             state = result
@@ -105,19 +187,46 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str, session_id: s
             # Get bot response
             bot_response = state['messages'][-1].content
             
-            # 3. Save Bot Response
-            await save_chat_message(client_id, session_id, "bot", bot_response)
-            
-            # 4. Save Interaction to Mem0 (Async/Background)
-            # We use asyncio.create_task to not block the websocket response
-            asyncio.create_task(memory_service.save_interaction(client_id, data, bot_response))
-            
-            # Send as JSON
+            # Final frame carries the full text so the client can replace the streamed draft
             await websocket.send_text(json.dumps({
                 "type": "message",
                 "role": "model",
                 "content": bot_response
             }))
+            fast_path.record_turn(bool(state.get("fast_path")), (time.perf_counter() - turn_started) * 1000)
+            
+            # 3. Save Bot Response (after the stream, off the user-facing path)
+            bot_sent_at = await save_chat_message(client_id, session_id, "bot", bot_response)
+            
+            # 4. Save Interaction to Mem0 (Async/Background)
+            # Queued so a user's turns are coalesced into one add, off the websocket path
+            memory_ingest.submit(client_id, data, bot_response)
+            
+            # Snapshot for a reconnect (taken only at the end of a completed turn)
+            session_store.record_turn(session_id, client_id, state, [
+                {"role": "user", "content": data, "created_at": user_sent_at},
+                {"role": "bot", "content": bot_response, "created_at": bot_sent_at},
+            ])
+            
+            # 5. Keep the next prompt inside the token budget, off the receive loop;
+            # the snapshot above is updated too once it finishes
+            compaction = conversation_window.compact_in_background(session_id, state["messages"])
+            if compaction is not None:
+                compaction.add_done_callback(
+                    lambda task: task.cancelled() or session_store.compacted(session_id, client_id, task.result())
+                )
+            turn_in_progress = False
             
     except WebSocketDisconnect:
         print(f"Client #{client_id} left the chat")
+    finally:
+        if turn_in_progress:
+            # Cut short after messages were saved: the cached entry would miss them,
+            # so the next connect rebuilds from history instead
+            session_store.invalidate(session_id)
+        # Write this session's messages soon; a reconnect before that still sees them,
+        # since history reads merge the writer's pending rows. Not awaited, so a
+        # disconnect never waits on other sessions' rows or on retry backoff.
+        chat_writer.flush_soon()
+        # Have fresh starters ready for this user's next session
+        starter_pool.schedule_refresh(client_id)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import OrderedDict
+from ..core.config import settings
+
+
+class AnalysisCache:
+    """
+    Stale-while-revalidate cache for the dashboard's LLM analysis.
+
+    Entries are keyed per user (and window) and tagged with a watermark of the
+    underlying mood data. A fresh entry is returned as is; if the watermark has
+    moved or the TTL has expired, the old text is returned immediately and a
+    single background refresh is scheduled. Refreshes of one key are at least
+    `min_refresh_interval` apart: one due sooner waits out the interval and
+    then uses the newest watermark, so a burst of mood logs costs one LLM
+    call. Only a user's very first load waits for the LLM, and concurrent
+    first loads of one key share a single generation.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, min_refresh_interval: float):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_refresh_interval = min_refresh_interval
+        # key -> {"watermark", "text", "generated_at"}
+        self._entries = OrderedDict()
+        self._loading = {}     # key -> generation for a cold miss, awaited by every miss
+        self._refreshing = {}  # key -> scheduled background refresh
+        self._latest = {}  # key -> (watermark, generate) for the scheduled refresh
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+    async def get(self, key, watermark, generate) -> str:
+        """
+        `generate` is a zero-argument coroutine function producing the text.
+        It should raise on failure so errors are never cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            task = self._loading.get(key)
+            if task is None:
+                # Newer than anything a scheduled refresh (e.g. of an evicted entry) was given
+                self._latest.pop(key, None)
+                task = self._loading[key] = asyncio.create_task(self._load(key, watermark, generate))
+            # Shielded: one caller going away must not cancel the load the others wait on
+            return await asyncio.shield(task)
+
+        self._entries.move_to_end(key)
+        fresh = entry["watermark"] == watermark and time.monotonic() - entry["generated_at"] < self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+            self._latest[key] = (watermark, generate)
+            if key not in self._refreshing:
+                delay = max(0.0, entry["generated_at"] + self.min_refresh_interval - time.monotonic())
+                self._refreshing[key] = asyncio.create_task(self._background_refresh(key, delay))
+        return entry["text"]
+
+    def pending_refresh(self, key):
+        """The in-flight background refresh task for `key`, if any."""
+        return self._refreshing.get(key)
+
+    async def _background_refresh(self, key, delay: float):
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            latest = self._latest.pop(key, None)
+            if latest is None:
+                # A cold load since then already used a newer watermark
+                return
+            await self._refresh(key, *latest)
+        except Exception as e:
+            # Keep serving the previous text; the next request will try again
+            print(f"Background analysis refresh failed: {e}")
+        finally:
+            self._latest.pop(key, None)
+            self._release(self._refreshing, key)
+
+    async def _load(self, key, watermark, generate) -> str:
+        try:
+            return await self._refresh(key, watermark, generate)
+        finally:
+            self._release(self._loading, key)
+
+    @staticmethod
+    def _release(tasks: dict, key):
+        # Only the task registered for the key removes it
+        if tasks.get(key) is asyncio.current_task():
+            del tasks[key]
+
+    async def _refresh(self, key, watermark, generate) -> str:
+        text = await generate()
+        self.refreshes += 1
+        self._entries[key] = {"watermark": watermark, "text": text, "generated_at": time.monotonic()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return text
+
+
+analysis_cache = AnalysisCache(
+    ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    min_refresh_interval=settings.ANALYSIS_MIN_REFRESH_SECONDS,
+)
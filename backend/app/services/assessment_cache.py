@@ -0,0 +1,86 @@
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional
+from ..core.config import settings
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 30 and 30.0 are the same model input
+        return float(value)
+    return value
+
+
+class AssessmentCache:
+    """
+    Content-addressed cache of assessment results.
+
+    The key is a SHA-256 of the canonical JSON of the model inputs (the
+    WellnessForm fields the model reads, normalized) plus the ML artifacts
+    version, so an unchanged resubmission reuses the prediction, SHAP top
+    features and (once generated) the LLM summary. A change of artifacts
+    clears the cache. Bounded LRU of `max_entries`.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> {"result": dict, "summary": str | None}
+        self._entries = OrderedDict()
+        self._version = None
+
+        self.hits = 0
+        self.summary_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "summary_hits": self.summary_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "artifacts_version": self._version,
+        }
+
+    def key_for(self, ml_input: dict, artifacts_version: str) -> str:
+        if artifacts_version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = artifacts_version
+        canonical = json.dumps(
+            {k: _normalize(v) for k, v in ml_input.items()},
+            sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(f"{artifacts_version}:{canonical}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """A copy of {"result", "summary"} for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if entry["summary"]:
+            self.summary_hits += 1
+        return copy.deepcopy(entry)
+
+    def put(self, key: str, result: dict):
+        self._entries[key] = {"result": copy.deepcopy(result), "summary": None}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set_summary(self, key: str, summary: str):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["summary"] = summary
+
+
+assessment_cache = AssessmentCache(max_entries=settings.ASSESSMENT_CACHE_MAX_ENTRIES)
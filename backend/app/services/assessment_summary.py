@@ -0,0 +1,150 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+from langchain_core.messages import SystemMessage
+from ..core.config import settings
+from ..core.database import get_repository, run_query
+from ..core.llm_scheduler import llm_scheduler
+from .ml_service import get_user_risk_profile
+from .assessment_cache import assessment_cache
+
+FALLBACK_SUMMARY = "Thank you for sharing. We'll use this to better support you."
+
+
+def get_feature_context(feature_name, inputs):
+    # Clean name
+    clean_name = feature_name.replace('encoder__', '').replace('remainder__', '')
+
+    # Case 1: One-Hot Encoded (e.g., "Employment Status_Unemployed")
+    if '_' in clean_name:
+        # Split by last underscore to separate category and value
+        parts = clean_name.rsplit('_', 1)
+        if len(parts) == 2:
+            category, value = parts
+            return f"{category}: {value}"
+
+    # Case 2: Numerical/Direct (e.g., "Age", "Income")
+    # Try to find exact match in inputs
+    if clean_name in inputs:
+        return f"{clean_name}: {inputs[clean_name]}"
+
+    # Fallback
+    return clean_name.replace('_', ' ')
+
+
+def build_summary_prompt(result: dict, ml_input: dict) -> str:
+    pred = result.get("prediction", "Unknown")
+    top_features = result.get("top_features", [])
+
+    # Format features with values for the prompt
+    features_context = []
+    for f in top_features:
+        ctx = get_feature_context(f['feature'], ml_input)
+        features_context.append(f"{ctx} (Impact: {'High' if abs(f['shap_value']) > 0.1 else 'Moderate'})")
+
+    features_str = "\n".join([f"- {fc}" for fc in features_context])
+
+    return (
+        "You are a warm, insightful wellness companion. A user just finished a health check-in. "
+        "Based on the analysis below, write 3-4 personalized, non-judgmental observations to help them reflect.\n\n"
+        f"Analysis Data:\n"
+        f"- Risk Level: {pred}\n"
+        f"- Top Influencing Factors:\n{features_str}\n\n"
+        "Guidelines:\n"
+        "1. **Be Direct but Kind**: Address the factors honestly. If they are sedentary, say 'We noticed physical activity is currently low, which can impact mood.' Don't sugarcoat or hallucinate positive traits not present in the data.\n"
+        "2. **Connect the Dots**: Briefly mention *why* a factor matters (e.g., 'Work stress can often drain energy needed for other things').\n"
+        "3. **Future Focus**: End each point with a tiny, hopeful look forward (e.g., 'Small steps here can make a big difference').\n"
+        "4. **No Jargon**: No 'SHAP', 'algorithms', 'features', 'encoders'.\n"
+        "5. **Format**: 3-4 bullet points. Start directly with the bullets."
+    )
+
+
+class AssessmentSummaryJobs:
+    """
+    Second phase of an assessment submission: the LLM summary.
+
+    /assessment/submit returns the prediction straight away and starts a job
+    here. When the summary is ready it is written into the user's in-memory
+    risk profile (so the chat agent sees it) and into the stored assessment
+    row. Clients poll `status` via /assessment/summary/{user_id}. Only each
+    user's latest submission is tracked, for at most `max_users` users.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        # user_id -> {"assessment_id", "status": "pending" | "ready", "summary"}
+        self._jobs = OrderedDict()
+
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self._jobs),
+            "pending": sum(1 for j in self._jobs.values() if j["status"] == "pending"),
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def status(self, user_id: str) -> Optional[dict]:
+        job = self._jobs.get(user_id)
+        if job is None:
+            return None
+        return {"assessment_id": job["assessment_id"], "status": job["status"], "summary": job["summary"]}
+
+    def _track(self, user_id: str, job: dict):
+        self._jobs[user_id] = job
+        self._jobs.move_to_end(user_id)
+        while len(self._jobs) > self.max_users:
+            self._jobs.popitem(last=False)
+
+    def record_ready(self, user_id: str, assessment_id: Optional[str], summary: str):
+        """For a summary that is already known (assessment cache hit); no job runs."""
+        self._track(user_id, {"assessment_id": assessment_id, "status": "ready", "summary": summary})
+
+    def start(self, user_id: str, assessment_id: Optional[str], result: dict, ml_input: dict, cache_key: Optional[str] = None):
+        job = {"assessment_id": assessment_id, "status": "pending", "summary": None}
+        self._track(user_id, job)
+        self.started += 1
+        asyncio.create_task(self._run(user_id, job, result, ml_input, cache_key))
+
+    async def _run(self, user_id: str, job: dict, result: dict, ml_input: dict, cache_key: Optional[str]):
+        try:
+            response = await llm_scheduler.ainvoke(
+                [SystemMessage(content=build_summary_prompt(result, ml_input))],
+                priority="assessment", user_id=user_id
+            )
+            summary = response.content
+            self.completed += 1
+            if cache_key:
+                # Identical resubmissions reuse it (the fallback text is never cached)
+                assessment_cache.set_summary(cache_key, summary)
+        except Exception as e:
+            print(f"LLM summarization failed: {e}")
+            summary = FALLBACK_SUMMARY
+            self.failed += 1
+
+        job["summary"] = summary
+        job["status"] = "ready"
+
+        # A newer submission owns the profile now; only this job's own row is updated
+        if self._jobs.get(user_id) is job:
+            profile = get_user_risk_profile(user_id)
+            if profile is not None:
+                profile["llm_analysis"] = summary
+
+        repo = get_repository()
+        if repo and job["assessment_id"]:
+            try:
+                await run_query(
+                    "user_assessments.update_summary",
+                    lambda: repo.update_assessment_summary(job["assessment_id"], summary),
+                    deadline=False,
+                )
+            except Exception as e:
+                print(f"Error saving assessment summary: {e}")
+
+
+assessment_summaries = AssessmentSummaryJobs(max_users=settings.ASSESSMENT_SUMMARY_MAX_USERS)
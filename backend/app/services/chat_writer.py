@@ -0,0 +1,36 @@
+from ..core.config import settings
+from ..repositories.base import summarize_chat_rows
+from .write_behind import WriteBehindWriter
+
+
+class ChatHistoryWriter(WriteBehindWriter):
+    """
+    One process-wide queue for chat_history. Messages from all sessions are
+    batched together; since batches are written in enqueue order (and each row
+    is stamped when queued), per-session ordering is preserved. A row the DB
+    rejects (e.g. a foreign-key violation) is dead-lettered instead of holding
+    up every other session (see WriteBehindWriter).
+    """
+
+    table = "chat_history"
+
+    def _insert(self, repo, batch: list):
+        repo.insert_chat_messages(batch)
+        # Keep the chat_sessions index in step. The messages are already stored, so a
+        # failure here must not fail the batch (a retry would duplicate them);
+        # the backfill job can repair the summary.
+        try:
+            repo.upsert_session_activity(summarize_chat_rows(batch))
+        except Exception as e:
+            print(f"Error updating session summaries: {e}")
+
+    def pending_for_session(self, session_id: str) -> list:
+        return self.pending("session_id", session_id)
+
+
+chat_writer = ChatHistoryWriter(
+    batch_size=settings.CHAT_FLUSH_BATCH_SIZE,
+    flush_interval=settings.CHAT_FLUSH_INTERVAL,
+    max_queue=settings.CHAT_QUEUE_MAX,
+    max_retries=settings.CHAT_FLUSH_RETRIES,
+)
@@ -0,0 +1,148 @@
+from collections import Counter
+from typing import List, Optional
+import numpy as np
+from ..core.config import settings
+from .mood_rollups import mood_day
+
+# Intensity (risk score) lives in [0, 1]; a fixed-bin histogram gives quantiles
+# that can be merged across chunks and days by simple addition.
+HIST_BINS = 100
+
+
+class CohortAggregate:
+    """
+    Mergeable population-level aggregate for one time bucket (a UTC day).
+    Everything is a count or a sum, so chunks and days combine with `merge`.
+    """
+
+    def __init__(self):
+        self.mood_count = 0
+        self.emotions = Counter()
+        self.intensity_sum = 0.0
+        self.high_intensity = 0
+        self.intensity_hist = np.zeros(HIST_BINS, dtype=np.int64)
+        self.active_users = 0  # exact per day only; not additive across days
+        self.assessment_count = 0
+        self.predictions = Counter()
+        self.risk_confidence_sum = 0.0
+
+    def add_moods(self, rows: List[dict]):
+        if not rows:
+            return
+        intensities = np.array([r.get("intensity") or 0.0 for r in rows], dtype=float)
+        self.mood_count += len(rows)
+        self.emotions.update(r.get("emotion") or "neutral" for r in rows)
+        self.intensity_sum += float(intensities.sum())
+        self.high_intensity += int((intensities >= settings.COHORT_HIGH_INTENSITY).sum())
+        hist, _ = np.histogram(np.clip(intensities, 0.0, 1.0), bins=HIST_BINS, range=(0.0, 1.0))
+        self.intensity_hist += hist
+
+    def add_assessments(self, rows: List[dict]):
+        self.assessment_count += len(rows)
+        self.predictions.update(str(r.get("risk_prediction")) for r in rows)
+        self.risk_confidence_sum += sum(r.get("risk_confidence") or 0.0 for r in rows)
+
+    def merge(self, other: "CohortAggregate"):
+        self.mood_count += other.mood_count
+        self.emotions.update(other.emotions)
+        self.intensity_sum += other.intensity_sum
+        self.high_intensity += other.high_intensity
+        self.intensity_hist += other.intensity_hist
+        self.active_users += other.active_users
+        self.assessment_count += other.assessment_count
+        self.predictions.update(other.predictions)
+        self.risk_confidence_sum += other.risk_confidence_sum
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate intensity quantile (upper edge of the bin it falls in)."""
+        total = int(self.intensity_hist.sum())
+        if not total:
+            return None
+        idx = int(np.searchsorted(np.cumsum(self.intensity_hist), q * total))
+        return round(min(idx + 1, HIST_BINS) / HIST_BINS, 2)
+
+    def summary(self) -> dict:
+        n = self.mood_count
+        return {
+            "mood_count": n,
+            "emotion_distribution": {e: round(c / n, 4) for e, c in self.emotions.most_common()} if n else {},
+            "avg_intensity": round(self.intensity_sum / n, 4) if n else None,
+            "high_intensity_share": round(self.high_intensity / n, 4) if n else None,
+            "intensity_p50": self.quantile(0.5),
+            "intensity_p90": self.quantile(0.9),
+            "intensity_p99": self.quantile(0.99),
+            "assessment_count": self.assessment_count,
+            "prediction_distribution": dict(self.predictions),
+            "avg_risk_confidence": round(self.risk_confidence_sum / self.assessment_count, 4) if self.assessment_count else None,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "mood_count": self.mood_count,
+            "emotions": dict(self.emotions),
+            "intensity_sum": self.intensity_sum,
+            "high_intensity": self.high_intensity,
+            "intensity_hist": self.intensity_hist.tolist(),
+            "active_users": self.active_users,
+            "assessment_count": self.assessment_count,
+            "predictions": dict(self.predictions),
+            "risk_confidence_sum": self.risk_confidence_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CohortAggregate":
+        agg = cls()
+        agg.mood_count = data.get("mood_count", 0)
+        agg.emotions = Counter(data.get("emotions", {}))
+        agg.intensity_sum = data.get("intensity_sum", 0.0)
+        agg.high_intensity = data.get("high_intensity", 0)
+        agg.intensity_hist = np.array(data.get("intensity_hist") or [0] * HIST_BINS, dtype=np.int64)
+        agg.active_users = data.get("active_users", 0)
+        agg.assessment_count = data.get("assessment_count", 0)
+        agg.predictions = Counter(data.get("predictions", {}))
+        agg.risk_confidence_sum = data.get("risk_confidence_sum", 0.0)
+        return agg
+
+
+def group_by_day(rows: List[dict]) -> dict:
+    days = {}
+    for row in rows:
+        days.setdefault(mood_day(row["created_at"]), []).append(row)
+    return days
+
+
+def rebuild_cohort_aggregates(repo, start_day: str, page_size: int = 5000) -> int:
+    """
+    Streams mood_logs and user_assessments from start_day (UTC) onwards in keyset
+    chunks and rewrites one cohort_daily_aggregates row per day. Only the per-day
+    aggregates (and that day's set of user ids) are held in memory. Blocking;
+    meant for the batch job. Returns the number of days written.
+    """
+    aggregates = {}
+    day_users = {}
+    start = f"{start_day}T00:00:00+00:00"
+
+    after = None
+    while True:
+        page = repo.fetch_mood_logs_page(after, page_size, start=start)
+        if not page:
+            break
+        for day, rows in group_by_day(page).items():
+            aggregates.setdefault(day, CohortAggregate()).add_moods(rows)
+            day_users.setdefault(day, set()).update(r["user_id"] for r in rows)
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    after = None
+    while True:
+        page = repo.fetch_assessments_page(start, after, page_size)
+        if not page:
+            break
+        for day, rows in group_by_day(page).items():
+            aggregates.setdefault(day, CohortAggregate()).add_assessments(rows)
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    for day, users in day_users.items():
+        aggregates[day].active_users = len(users)
+
+    repo.upsert_cohort_aggregates([{"day": day, "payload": agg.to_dict()} for day, agg in sorted(aggregates.items())])
+    return len(aggregates)
@@ -0,0 +1,156 @@
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from ..core.config import settings
+from ..core.llm_scheduler import llm_scheduler
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a supportive chat between a user and an AI companion.\n"
+    "Update the summary with the new lines below. Keep what matters for continuity: "
+    "what the user shared, how they are feeling, coping ideas already suggested and how they landed, "
+    "and any names, events or plans they mentioned. Write in the third person, plain prose, "
+    "under {max_words} words. Return only the updated summary."
+)
+
+
+class ConversationWindow:
+    """
+    Keeps the graph's message list inside a token budget.
+
+    When a session's messages exceed `token_budget`, the oldest turns are folded
+    into a rolling summary until the remainder fits in `keep_tokens` (leaving
+    headroom, so the summarizer runs every few turns rather than every turn).
+    Summaries are cached per session (LRU, `max_sessions`), so a reconnect picks
+    up where the conversation left off. The rebuilt history tail can overlap
+    what the summary already covers; that only costs a few repeated facts.
+
+    The chat socket runs it with `compact_in_background` after a reply is sent
+    and folds the result in with `apply_compaction` before the next turn.
+    """
+
+    def __init__(self, token_budget: int, keep_tokens: int, summary_words: int, max_sessions: int):
+        self.token_budget = token_budget
+        self.keep_tokens = keep_tokens
+        self.summary_words = summary_words
+        self.max_sessions = max_sessions
+        self._summaries = OrderedDict()  # session_id -> summary text
+        self._compacting = {}  # session_id -> running background compaction
+
+        self.compactions = 0
+        self.folded_messages = 0
+        self.failures = 0
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._summaries),
+            "compacting": len(self._compacting),
+            "compactions": self.compactions,
+            "folded_messages": self.folded_messages,
+            "failures": self.failures,
+        }
+
+    def summary_for(self, session_id: str) -> str:
+        summary = self._summaries.get(session_id, "")
+        if summary:
+            self._summaries.move_to_end(session_id)
+        return summary
+
+    def _split(self, messages: List[AnyMessage]) -> Tuple[List[AnyMessage], List[AnyMessage]]:
+        """(to fold, to keep): the newest messages fitting keep_tokens, starting on a user turn."""
+        keep_from = len(messages)
+        used = 0
+        while keep_from > 1:
+            cost = count_tokens_approximately([messages[keep_from - 1]])
+            if used + cost > self.keep_tokens:
+                break
+            used += cost
+            keep_from -= 1
+        # Don't open the window on a dangling bot reply
+        while keep_from < len(messages) - 1 and not isinstance(messages[keep_from], HumanMessage):
+            keep_from += 1
+        return messages[:keep_from], messages[keep_from:]
+
+    async def compact(self, session_id: str, messages: List[AnyMessage]) -> Tuple[List[AnyMessage], str]:
+        """
+        Returns (messages, summary) for the next turn. Under budget this is a
+        no-op; otherwise older turns are folded into the session's summary.
+        If summarizing fails the messages are returned untouched and the next
+        turn tries again.
+        """
+        summary = self.summary_for(session_id)
+        if count_tokens_approximately(messages) <= self.token_budget:
+            return messages, summary
+
+        folded, kept = self._split(messages)
+        if not folded:
+            return messages, summary
+
+        transcript = "\n".join(
+            f"{'User' if isinstance(m, HumanMessage) else 'Companion'}: {m.content}" for m in folded
+        )
+        try:
+            # Chat priority: the next turn waits on this if it hasn't finished yet
+            response = await llm_scheduler.ainvoke([
+                SystemMessage(content=SUMMARY_PROMPT.format(max_words=self.summary_words)),
+                HumanMessage(content=f"Current summary:\n{summary or '(none yet)'}\n\nNew lines:\n{transcript}"),
+            ], priority="chat")
+        except Exception as e:
+            self.failures += 1
+            print(f"Error summarizing conversation: {e}")
+            return messages, summary
+
+        summary = response.content.strip()
+        self._summaries[session_id] = summary
+        self._summaries.move_to_end(session_id)
+        while len(self._summaries) > self.max_sessions:
+            self._summaries.popitem(last=False)
+        self.compactions += 1
+        self.folded_messages += len(folded)
+        return kept, summary
+
+    def compact_in_background(self, session_id: str, messages: List[AnyMessage]) -> Optional[asyncio.Task]:
+        """
+        Starts compact() on a snapshot of `messages` as a task, or returns None
+        when they are under budget. The task's result, (snapshot, messages,
+        summary), goes to apply_compaction. One runs per session at a time (a
+        call while it runs gets the same task), and it is kept referenced until
+        done, so it outlives the socket that started it.
+        """
+        running = self._compacting.get(session_id)
+        if running is not None:
+            return running
+        if count_tokens_approximately(messages) <= self.token_budget:
+            return None
+        snapshot = list(messages)
+
+        async def run():
+            try:
+                kept, summary = await self.compact(session_id, snapshot)
+                return snapshot, kept, summary
+            finally:
+                self._compacting.pop(session_id, None)
+
+        task = asyncio.create_task(run())
+        self._compacting[session_id] = task
+        return task
+
+
+def apply_compaction(messages: List[AnyMessage], compaction: tuple) -> Optional[List[AnyMessage]]:
+    """
+    `messages` with a finished background compaction folded in (messages added
+    since its snapshot are kept), or None if they no longer extend the snapshot.
+    """
+    snapshot, kept, _ = compaction
+    if len(messages) < len(snapshot) or messages[len(snapshot) - 1] is not snapshot[-1]:
+        return None
+    return kept + messages[len(snapshot):]
+
+
+conversation_window = ConversationWindow(
+    token_budget=settings.CONTEXT_TOKEN_BUDGET,
+    keep_tokens=settings.CONTEXT_KEEP_TOKENS,
+    summary_words=settings.CONTEXT_SUMMARY_WORDS,
+    max_sessions=settings.CONTEXT_SUMMARY_MAX_SESSIONS,
+)
@@ -0,0 +1,50 @@
+import asyncio
+from ..core.config import settings
+
+
+class DashboardEventHub:
+    """
+    In-process pub/sub for live dashboards. log_mood publishes each new mood for
+    a user; every open dashboard subscription for that user gets it on its own
+    bounded queue. Publishing never blocks: a subscriber that falls behind just
+    loses events (it still has its snapshot and the next delta).
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers = {}  # user_id -> set of asyncio.Queue
+
+        self.published = 0
+        self.dropped = 0
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: str, event: dict):
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+                self.published += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+
+dashboard_events = DashboardEventHub(queue_size=settings.DASHBOARD_EVENT_QUEUE_SIZE)
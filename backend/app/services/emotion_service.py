@@ -1,5 +1,14 @@
 import httpx
 from ..core.config import settings
+from ..core.executors import get_executor
+
+async def _post_text(text: str) -> httpx.Response:
+    async with httpx.AsyncClient() as client:
+        return await client.post(
+            settings.EMOTIONS_API_URL,
+            json={"text": text},
+            timeout=settings.EMOTION_TIMEOUT
+        )
 
 async def detect_emotion(text: str) -> dict:
     """
@@ -11,27 +20,23 @@ async def detect_emotion(text: str) -> dict:
         return {"label": "neutral", "confidence": 1.0}
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                settings.EMOTIONS_API_URL,
-                json={"text": text},
-                timeout=5.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # The API returns {"predictions": {"emotion_name": score}, ...}
-            predictions = data.get("predictions", {})
-            print("predictions:")
-            print(predictions)
-            if predictions:
-                # Get the emotion with the highest score
-                top_emotion = max(predictions, key=predictions.get)
-                print("top emotion:")
-                print(top_emotion)
-                confidence = predictions[top_emotion]
-                return {"label": top_emotion, "confidence": confidence}
-            
+        # Limited and timed by the "emotion" executor lane
+        response = await get_executor("emotion").call(_post_text, text)
+        response.raise_for_status()
+        data = response.json()
+
+        # The API returns {"predictions": {"emotion_name": score}, ...}
+        predictions = data.get("predictions", {})
+        print("predictions:")
+        print(predictions)
+        if predictions:
+            # Get the emotion with the highest score
+            top_emotion = max(predictions, key=predictions.get)
+            print("top emotion:")
+            print(top_emotion)
+            confidence = predictions[top_emotion]
+            return {"label": top_emotion, "confidence": confidence}
+        
     except Exception as e:
         print(f"Error detecting emotion: {e}")
     
@@ -0,0 +1,116 @@
+import random
+from collections import Counter
+from typing import List, Optional
+from ..core.config import settings
+from .intent_engine import intent_engine
+from .mood_rollups import EMOTION_VALENCE
+
+# Intents that can be answered straight from intents.json without the LLM.
+# Value: minimum pattern similarity (None = FAST_PATH_MIN_SCORE). Anything
+# emotional or safety-related is deliberately left out and always goes to the LLM,
+# and so are "goodbye" and "night": a farewell can be a crisis signal.
+FAST_PATH_POLICY = {
+    "greeting": None,
+    "morning": None,
+    "afternoon": None,
+    "evening": None,
+    "thanks": None,
+    "about": 0.8,
+    "location": 0.8,
+}
+
+# Extra phrasings mixed into the verified responses when FAST_PATH_VARIATIONS is on
+VARIATIONS = {
+    "greeting": [
+        "Hi! Good to see you. How's everything going?",
+        "Hey there! What's on your mind today?",
+    ],
+    "thanks": [
+        "Anytime! I'm glad I could help.",
+        "Of course. I'm always happy to listen.",
+    ],
+}
+
+
+class FastPath:
+    """
+    Decides whether a turn can skip the LLM and picks the templated reply.
+
+    A turn qualifies when its intent is in FAST_PATH_POLICY, the message is
+    short (`max_chars`), the pattern match is at least as strong as the
+    intent's threshold, the turn's own emotion is non-negative with at least
+    `min_emotion_confidence`, and neither the user's recent mood trend nor
+    their latest assessment carries risk. Counters are kept separately from
+    LLM turns.
+    """
+
+    def __init__(self, min_score: float, use_variations: bool, max_chars: int, min_emotion_confidence: float):
+        self.min_score = min_score
+        self.use_variations = use_variations
+        self.max_chars = max_chars
+        self.min_emotion_confidence = min_emotion_confidence
+
+        self.answered = Counter()      # tag -> turns answered without the LLM
+        self.low_confidence = Counter()  # tag -> policy intents sent to the LLM on a weak match
+        self.too_long = Counter()      # tag -> policy intents sent to the LLM for message length
+        self.emotion_blocked = Counter()  # tag -> policy intents sent to the LLM for the turn's emotion
+        self.risk_blocked = Counter()  # tag -> policy intents sent to the LLM because of risk
+        # End-to-end turn latency, fast path vs LLM, recorded by the chat websocket
+        self.turns = {"fast": {"count": 0, "total_ms": 0.0}, "llm": {"count": 0, "total_ms": 0.0}}
+
+    def stats(self) -> dict:
+        return {
+            "answered": sum(self.answered.values()),
+            "by_intent": dict(self.answered),
+            "low_confidence": dict(self.low_confidence),
+            "too_long": dict(self.too_long),
+            "emotion_blocked": dict(self.emotion_blocked),
+            "risk_blocked": dict(self.risk_blocked),
+            "turns": {
+                path: {"count": t["count"], "avg_ms": round(t["total_ms"] / t["count"], 2) if t["count"] else 0.0}
+                for path, t in self.turns.items()
+            },
+        }
+
+    def record_turn(self, fast: bool, elapsed_ms: float):
+        t = self.turns["fast" if fast else "llm"]
+        t["count"] += 1
+        t["total_ms"] += elapsed_ms
+
+    def eligible(self, tag: str, score: float, text: str, emotion: Optional[str], emotion_confidence: float,
+                 trend_risk: int, risk_prediction: Optional[str]) -> bool:
+        if tag not in FAST_PATH_POLICY:
+            return False
+        if len(text) > self.max_chars:
+            # A short pattern can match the opening of a long message
+            self.too_long[tag] += 1
+            return False
+        threshold = FAST_PATH_POLICY[tag] or self.min_score
+        if score < threshold:
+            self.low_confidence[tag] += 1
+            return False
+        # Unknown emotions fall below neutral too
+        if emotion_confidence < self.min_emotion_confidence or EMOTION_VALENCE.get(emotion, 0) < EMOTION_VALENCE["neutral"]:
+            self.emotion_blocked[tag] += 1
+            return False
+        if trend_risk > 0 or risk_prediction == "Yes":
+            self.risk_blocked[tag] += 1
+            return False
+        return True
+
+    def reply(self, tag: str, last_reply: Optional[str] = None) -> str:
+        pool: List[str] = list(intent_engine.responses_map.get(tag, []))
+        if self.use_variations:
+            pool += VARIATIONS.get(tag, [])
+        # Don't say the exact same thing twice in a row
+        choices = [r for r in pool if r != last_reply] or pool
+        self.answered[tag] += 1
+        return random.choice(choices)
+
+
+fast_path = FastPath(
+    min_score=settings.FAST_PATH_MIN_SCORE,
+    use_variations=settings.FAST_PATH_VARIATIONS,
+    max_chars=settings.FAST_PATH_MAX_CHARS,
+    min_emotion_confidence=settings.FAST_PATH_MIN_EMOTION_CONFIDENCE,
+)
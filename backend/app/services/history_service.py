@@ -1,73 +1,108 @@
-from ..core.database import get_supabase
+from ..core.database import get_repository, run_query
+from .chat_writer import chat_writer
+from datetime import datetime, timezone
 
-async def fetch_chat_history(session_id: str, limit: int = 50):
-    supabase = get_supabase()
-    if not supabase:
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _message_key(r: dict):
+    return _parse_ts(r["created_at"]), r["content"]
+
+async def fetch_chat_history(session_id: str, limit: int = 50, before: str = None, before_id=None):
+    """
+    Up to `limit` messages of a session, oldest first. Pass the `created_at` and
+    `id` of the oldest message already loaded as `before` / `before_id` to page
+    further back.
+    """
+    repo = get_repository()
+    if not repo:
         return []
     
+    # Messages still waiting in the write-behind queue are the newest of the session.
+    # Snapshotted before the DB read; any that commit in between are dropped below.
+    pending = chat_writer.pending_for_session(session_id)
+    cursor = None
+    if before:
+        # An unencoded "+00:00" offset arrives as " 00:00" in a query string
+        before = before.replace(' ', '+')
+        cursor = (before, before_id)
+        pending = [r for r in pending if _parse_ts(r["created_at"]) < _parse_ts(before)]
+    pending = pending[-limit:]
     try:
-        response = supabase.table("chat_history")\
-            .select("*")\
-            .eq("session_id", session_id)\
-            .order("created_at", desc=True)\
-            .limit(limit)\
-            .execute()
+        rows = []
+        if len(pending) < limit:
+            rows = await run_query("chat_history.fetch", lambda: repo.fetch_chat_history(session_id, limit, cursor))
+            stored = {_message_key(r) for r in rows}
+            pending = [r for r in pending if _message_key(r) not in stored]
         
         # Return reversed so it's chronological (oldest first)
-        return response.data[::-1] 
+        return (rows[::-1] + pending)[-limit:]
     except Exception as e:
         print(f"Error fetching history: {e}")
-        return []
+        return pending
+
+async def fetch_chat_history_page(session_id: str, limit: int, before: str = None, before_id=None) -> dict:
+    """
+    One page of history plus the cursor for the next (older) page, or None
+    when the start of the session has been reached.
+    """
+    rows = await fetch_chat_history(session_id, limit + 1, before, before_id)
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[1:]
+    cursor = None
+    if has_more and rows:
+        cursor = {"before": rows[0]["created_at"], "before_id": rows[0].get("id")}
+    return {"messages": rows, "cursor": cursor}
 
-async def fetch_user_sessions(user_id: str):
-    supabase = get_supabase()
-    if not supabase:
+async def fetch_user_sessions(user_id: str, limit: int = 50, before: str = None, before_id: str = None):
+    """
+    Sidebar listing from the chat_sessions summary index, most recent first.
+    Pass the `last_message_at` and `id` of the last session received as
+    `before` / `before_id` to get the next page.
+    """
+    repo = get_repository()
+    if not repo:
         return []
     
+    cursor = None
+    if before and before_id:
+        # An unencoded "+00:00" offset arrives as " 00:00" in a query string
+        cursor = (before.replace(' ', '+'), before_id)
     try:
-        # Fetch distinct session_ids with their latest message
-        # Note: Supabase/PostgREST doesn't support DISTINCT ON easily in simple queries sometimes,
-        # but we can fetch all and process in python for MVP or use a view.
-        # For better performance, we should use a separate 'sessions' table.
-        # For now, let's fetch all history (limit 1000) and group by session_id in Python.
-        
-        response = supabase.table("chat_history")\
-            .select("session_id, content, created_at")\
-            .eq("user_id", user_id)\
-            .order("created_at", desc=True)\
-            .limit(500)\
-            .execute()
-            
-        sessions = {}
-        for row in response.data:
-            sid = row['session_id']
-            if sid not in sessions:
-                sessions[sid] = {
-                    "id": sid,
-                    "preview": row['content'],
-                    "created_at": row['created_at']
-                }
-        
-        return list(sessions.values())
+        rows = await run_query("chat_sessions.fetch", lambda: repo.fetch_sessions(user_id, limit, cursor))
+        return [
+            {
+                "id": r["session_id"],
+                "preview": r["preview"],
+                "created_at": r["last_message_at"],  # kept for older clients
+                "last_message_at": r["last_message_at"],
+                "message_count": r["message_count"]
+            }
+            for r in rows
+        ]
     except Exception as e:
         print(f"Error fetching sessions: {e}")
         return []
 
-async def save_chat_message(user_id: str, session_id: str, role: str, content: str):
-    supabase = get_supabase()
-    if not supabase:
-        return
+async def save_chat_message(user_id: str, session_id: str, role: str, content: str) -> str:
+    """Queues the message and returns its `created_at` stamp."""
+    # Stamped now so ordering follows the conversation
+    created_at = datetime.now(timezone.utc).isoformat()
+    repo = get_repository()
+    if not repo:
+        return created_at
     
-    try:
-        # Skip saving for non-UUID guest IDs to avoid FK violations
-        if len(user_id) != 36:
-            return
+    # Skip saving for non-UUID guest IDs to avoid FK violations
+    if len(user_id) != 36:
+        return created_at
 
-        supabase.table("chat_history").insert({
-            "user_id": user_id,
-            "session_id": session_id,
-            "role": role,
-            "content": content
-        }).execute()
-    except Exception as e:
-        print(f"Error saving message: {e}")
+    # Queued for a bulk insert
+    chat_writer.enqueue({
+        "user_id": user_id,
+        "session_id": session_id,
+        "role": role,
+        "content": content,
+        "created_at": created_at
+    })
+    return created_at
@@ -48,6 +48,11 @@ class IntentEngine:
             return json.load(f)
 
     def detect_intent(self, user_text):
+        tag, response, _ = self.detect_intent_scored(user_text)
+        return tag, response
+
+    def detect_intent_scored(self, user_text):
+        """Like detect_intent, plus the cosine similarity of the best-matching pattern."""
         # 1. Encode user text
         user_embedding = self.model.encode([user_text])
         
@@ -56,16 +61,16 @@ class IntentEngine:
         
         # 3. Find best match
         best_idx = np.argmax(similarities)
-        best_score = similarities[best_idx]
+        best_score = float(similarities[best_idx])
         
         if best_score < settings.SIMILARITY_THRESHOLD:
-            return "unknown", "I'm not sure I understand, but I'm here to listen."
+            return "unknown", "I'm not sure I understand, but I'm here to listen.", best_score
         
         # 4. Return Tag and a Random Verified Response
         tag = self.tags[best_idx]
         import random
         response = random.choice(self.responses_map[tag])
         
-        return tag, response
+        return tag, response, best_score
 
 intent_engine = IntentEngine()
@@ -0,0 +1,212 @@
+import json
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+from ..core.executors import get_executor
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+VECTOR_DTYPE = np.float16
+ROW_BYTES = EMBEDDING_DIM * np.dtype(VECTOR_DTYPE).itemsize
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    # Same MiniLM model the intent engine already has loaded
+    from .intent_engine import intent_engine
+    return np.asarray(intent_engine.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+class LocalMemoryService:
+    """
+    Embedded alternative to the hosted Mem0 backend (MEMORY_BACKEND=local).
+
+    Same contract as MemoryService. Each user message worth remembering is
+    stored as a snippet with its normalized MiniLM embedding, in two
+    append-only files under `path`:
+      - vectors.f16: one float16 row of EMBEDDING_DIM values per snippet,
+        read through a memory map
+      - snippets.jsonl: one line per row (user_id, text, created_at)
+    Saving appends to both files (the existing rows are never rewritten) and
+    the map is reopened once it has fallen behind. A search is one matrix
+    product over the user's rows plus an argpartition for the `top_k` best
+    at or above `min_score`. A snippet nearly identical to one the user
+    already has (`dedup_similarity`) is not stored again.
+    """
+
+    def __init__(self, path: str, top_k: int, min_score: float, dedup_similarity: float,
+                 min_words: int = 4, max_chars: int = 500):
+        self.path = path
+        self.top_k = top_k
+        self.min_score = min_score
+        self.dedup_similarity = dedup_similarity
+        self.min_words = min_words
+        self.max_chars = max_chars
+
+        self._vectors_path = os.path.join(path, "vectors.f16")
+        self._snippets_path = os.path.join(path, "snippets.jsonl")
+        # Appends come from several executor threads; reads take a snapshot under it
+        self._lock = threading.Lock()
+        self._texts = []        # row -> snippet text
+        self._user_rows = {}    # user_id -> list of rows, oldest first
+        self._map = None
+        self._mapped_rows = 0
+
+        self.searches = 0
+        self.saved = 0
+        self.duplicates = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def stats(self) -> dict:
+        return {
+            "snippets": len(self._texts),
+            "users": len(self._user_rows),
+            "searches": self.searches,
+            "saved": self.saved,
+            "duplicates": self.duplicates,
+        }
+
+    def _load(self):
+        records = []
+        if os.path.exists(self._snippets_path):
+            with open(self._snippets_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # torn last line from an interrupted append
+
+        vector_bytes = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = min(vector_bytes // ROW_BYTES, len(records))
+        if vector_bytes != rows * ROW_BYTES or rows != len(records):
+            # An append was interrupted between the two files; drop the partial row
+            print(f"Local memory: recovering {rows} complete snippets")
+            records = records[:rows]
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * ROW_BYTES)
+            with open(self._snippets_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+
+        for row, record in enumerate(records):
+            self._texts.append(record["text"])
+            self._user_rows.setdefault(record["user_id"], []).append(row)
+        print(f"Local memory loaded: {len(self._texts)} snippets for {len(self._user_rows)} users")
+
+    def _vectors(self, rows: int) -> Optional[np.ndarray]:
+        """Memory map covering at least `rows` rows (reopened only after appends)."""
+        if rows == 0:
+            return None
+        if self._map is None or self._mapped_rows < rows:
+            total = os.path.getsize(self._vectors_path) // ROW_BYTES
+            self._map = np.memmap(self._vectors_path, dtype=VECTOR_DTYPE, mode="r", shape=(total, EMBEDDING_DIM))
+            self._mapped_rows = total
+        return self._map
+
+    def _search(self, user_id: str, query_vectors: np.ndarray, k: int):
+        """Per query: [(row, score)] of the user's `k` nearest snippets, best first."""
+        with self._lock:
+            rows = np.array(self._user_rows.get(user_id, ()), dtype=np.int64)
+            vectors = self._vectors(len(self._texts))
+        if len(rows) == 0:
+            return [[] for _ in query_vectors]
+
+        scores = query_vectors @ vectors[rows].astype(np.float32).T  # (queries, user rows)
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for q, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[q, candidates])]
+            results.append([(int(rows[i]), float(scores[q, i])) for i in ordered])
+        return results
+
+    def _worth_storing(self, text: str) -> bool:
+        return len(text.split()) >= self.min_words
+
+    def _add(self, user_id: str, messages: list):
+        texts = [m["content"].strip()[:self.max_chars] for m in messages if m.get("role") == "user"]
+        texts = [t for t in texts if self._worth_storing(t)]
+        if not texts:
+            return
+        embeddings = _encode(texts)
+
+        # Skip what the user has already told us (and repeats within this batch)
+        nearest = self._search(user_id, embeddings, 1)
+        keep = []
+        for i, text in enumerate(texts):
+            if nearest[i] and nearest[i][0][1] >= self.dedup_similarity:
+                self.duplicates += 1
+                continue
+            if any(float(embeddings[i] @ embeddings[j]) >= self.dedup_similarity for j in keep):
+                self.duplicates += 1
+                continue
+            keep.append(i)
+        if not keep:
+            return
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            # Vectors first: a crash before the snippet line leaves a row that _load trims
+            with open(self._vectors_path, "ab") as f:
+                f.write(embeddings[keep].astype(VECTOR_DTYPE).tobytes())
+            with open(self._snippets_path, "a", encoding="utf-8") as f:
+                for i in keep:
+                    f.write(json.dumps({"user_id": user_id, "text": texts[i], "created_at": created_at}) + "\n")
+            rows = self._user_rows.setdefault(user_id, [])
+            for i in keep:
+                rows.append(len(self._texts))
+                self._texts.append(texts[i])
+            self.saved += len(keep)
+
+    async def get_memories(self, user_id: str) -> list:
+        """Text of the user's most recent snippets (may be empty)."""
+        with self._lock:
+            rows = self._user_rows.get(user_id, [])[-10:]
+            return [self._texts[r] for r in reversed(rows)]
+
+    async def get_random_memory(self, user_id: str) -> str:
+        valid_memories = await self.get_memories(user_id)
+        if valid_memories:
+            return random.choice(valid_memories)
+        return None
+
+    async def get_therapeutic_context(self, user_id: str, user_message: str) -> str:
+        if user_id not in self._user_rows:
+            return ""
+
+        try:
+            def search():
+                self.searches += 1
+                return self._search(user_id, _encode([user_message]), self.top_k)[0]
+
+            matches = [(row, score) for row, score in await get_executor("models").run(search) if score >= self.min_score]
+            if not matches:
+                return ""
+            # Same shape as the Mem0 context so the prompt doesn't change
+            context_str = "Past Context:\n"
+            for row, _ in matches:
+                context_str += f"- {self._texts[row]}\n"
+            return context_str
+        except Exception as e:
+            print(f"Error searching local memory: {e}")
+            return ""
+
+    async def save_messages(self, user_id: str, messages: list, executor=None, deadline: bool = True):
+        """
+        Stores the user turns among `messages` on `executor` (a core.executors
+        lane, "models" by default); raises on failure (callers decide what to do).
+        """
+        await (executor or get_executor("models")).run(lambda: self._add(user_id, messages), deadline=deadline)
+
+    async def save_interaction(self, user_id: str, user_message: str, assistant_response: str):
+        try:
+            messages = [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": assistant_response}
+            ]
+            await self.save_messages(user_id, messages)
+        except Exception as e:
+            print(f"Error saving interaction to local memory: {e}")
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional, Tuple
+import numpy as np
+from ..core.config import settings
+from ..core.executors import get_executor
+
+
+class MemorySearchCache:
+    """
+    Per-user cache of Mem0 search results, matched by query meaning.
+
+    Each user keeps their last `per_user` searches as (normalized query
+    embedding, result). A new query hits if its cosine similarity to a cached
+    query is at least `threshold`, so rephrasings of the same thing skip the
+    remote search. A user's entries are dropped when save_interaction adds
+    memories for them, and expire after `ttl` seconds anyway (Mem0 extracts
+    memories asynchronously, so new ones can appear a little after an add).
+    At most `max_users` users are kept (LRU). Queries are embedded on the
+    "models" executor lane, off the event loop.
+    """
+
+    def __init__(self, embed: Callable[[str], np.ndarray], threshold: float, per_user: int, max_users: int, ttl: float):
+        self.embed = embed
+        self.threshold = threshold
+        self.per_user = per_user
+        self.max_users = max_users
+        self.ttl = ttl
+        # user_id -> deque of (embedding, result, stored_at)
+        self._users = OrderedDict()
+        # user_id -> time of the last invalidation; a search that started earlier isn't stored
+        self._invalidated = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "entries": sum(len(e) for e in self._users.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    async def lookup(self, user_id: str, query: str) -> Tuple[Optional[str], Optional[np.ndarray], float]:
+        """(cached result or None, query embedding, lookup time). Pass the last two to `store`."""
+        started = time.monotonic()
+        try:
+            embedding = await get_executor("models").run(self.embed, query)
+        except Exception as e:
+            print(f"Error embedding memory query: {e}")
+            return None, None, started
+
+        entries = self._users.get(user_id)
+        if entries:
+            fresh = [e for e in entries if started - e[2] <= self.ttl]
+            if fresh:
+                sims = np.stack([e[0] for e in fresh]) @ embedding
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    self._users.move_to_end(user_id)
+                    self.hits += 1
+                    return fresh[best][1], embedding, started
+        self.misses += 1
+        return None, embedding, started
+
+    def store(self, user_id: str, embedding: Optional[np.ndarray], result: str, started: float):
+        if embedding is None or started < self._invalidated.get(user_id, 0.0):
+            return
+        entries = self._users.get(user_id)
+        if entries is None:
+            entries = self._users[user_id] = deque(maxlen=self.per_user)
+        entries.append((embedding, result, time.monotonic()))
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        if self._users.pop(user_id, None) is not None:
+            self.invalidations += 1
+        self._invalidated[user_id] = time.monotonic()
+        self._invalidated.move_to_end(user_id)
+        while len(self._invalidated) > self.max_users:
+            self._invalidated.popitem(last=False)
+
+
+def _embed(text: str) -> np.ndarray:
+    # Same MiniLM model the intent engine already has loaded
+    from .intent_engine import intent_engine
+    return intent_engine.model.encode([text], normalize_embeddings=True)[0]
+
+
+memory_search_cache = MemorySearchCache(
+    embed=_embed,
+    threshold=settings.MEMORY_CACHE_SIMILARITY,
+    per_user=settings.MEMORY_CACHE_PER_USER,
+    max_users=settings.MEMORY_CACHE_MAX_USERS,
+    ttl=settings.MEMORY_CACHE_TTL_SECONDS,
+)
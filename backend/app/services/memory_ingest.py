@@ -0,0 +1,151 @@
+import asyncio
+from collections import OrderedDict
+from ..core.config import settings
+from ..core.executors import get_executor
+from .memory_service import memory_service
+from .starter_pool import starter_pool
+
+
+class MemoryIngestQueue:
+    """
+    Managed queue for adding chat turns to Mem0.
+
+    Turns are queued per user and picked up by `workers` background tasks,
+    each making blocking Mem0 calls on the "mem0_ingest" executor lane of the
+    same size (so ingest never competes with searches), waiting for each add
+    to finish rather than abandoning it at a deadline. All turns a
+    user has queued are coalesced into one `add` call (up to
+    `max_batch_turns`), and one user is never ingested by two workers at
+    once, so their turns arrive in order. The backlog is bounded at
+    `max_backlog` turns; beyond that the oldest turn is dropped. `stop`
+    drains what is left, up to `drain_timeout` seconds.
+    """
+
+    def __init__(self, workers: int, max_backlog: int, max_batch_turns: int, drain_timeout: float):
+        self.workers = workers
+        self.max_backlog = max_backlog
+        self.max_batch_turns = max_batch_turns
+        self.drain_timeout = drain_timeout
+
+        self._pending = OrderedDict()  # user_id -> list of turns, users in arrival order
+        self._busy_users = set()
+        self._backlog = 0
+        self._wakeup = None
+        self._tasks = []
+        self._stopping = False
+
+        self.saved_turns = 0
+        self.add_calls = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self._backlog,
+            "users_waiting": len(self._pending),
+            "saved_turns": self.saved_turns,
+            "add_calls": self.add_calls,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "running": any(not t.done() for t in self._tasks),
+        }
+
+    def submit(self, user_id: str, user_message: str, assistant_response: str):
+        if self._backlog >= self.max_backlog:
+            # Shed the oldest queued turn rather than grow without bound
+            oldest_user = next(iter(self._pending))
+            turns = self._pending[oldest_user]
+            turns.pop(0)
+            if not turns:
+                del self._pending[oldest_user]
+            self._backlog -= 1
+            self.dropped += 1
+
+        self._pending.setdefault(user_id, []).append([
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_response}
+        ])
+        self._backlog += 1
+        self._ensure_started()
+        self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._tasks and any(not t.done() for t in self._tasks):
+            return
+        loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def start(self):
+        self._ensure_started()
+
+    async def stop(self):
+        """Finish the queued turns (bounded by drain_timeout), then stop the workers."""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._tasks:
+            done, not_done = await asyncio.wait(self._tasks, timeout=self.drain_timeout)
+            for task in not_done:
+                task.cancel()
+            if not_done:
+                print(f"Mem0 ingest: {self._backlog} turns left unsaved at shutdown")
+            self._tasks = []
+
+    def _next_batch(self):
+        for user_id in self._pending:
+            if user_id not in self._busy_users:
+                turns = self._pending[user_id]
+                batch, rest = turns[:self.max_batch_turns], turns[self.max_batch_turns:]
+                if rest:
+                    # Keep the remainder queued (behind other users)
+                    self._pending[user_id] = rest
+                    self._pending.move_to_end(user_id)
+                else:
+                    del self._pending[user_id]
+                self._backlog -= len(batch)
+                return user_id, batch
+        return None, None
+
+    async def _worker(self):
+        while True:
+            user_id, batch = self._next_batch()
+            if user_id is None:
+                if self._stopping and not self._busy_users:
+                    return
+                self._wakeup.clear()
+                if self._stopping:
+                    # Other workers still hold users; wait for them to hand back
+                    await asyncio.sleep(0.05)
+                else:
+                    await self._wakeup.wait()
+                continue
+
+            self._busy_users.add(user_id)
+            try:
+                messages = [m for turn in batch for m in turn]
+                # No deadline: the user stays busy until the add has really finished,
+                # so their next batch can't run alongside it
+                await memory_service.save_messages(
+                    user_id, messages, executor=get_executor("mem0_ingest"), deadline=False
+                )
+                self.add_calls += 1
+                self.saved_turns += len(batch)
+                # New memories may make better starters (debounced)
+                starter_pool.schedule_refresh(user_id, debounce=True)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"Error saving {len(batch)} turns to memory: {e}")
+            finally:
+                self._busy_users.discard(user_id)
+                # This user's newer turns may be waiting on us
+                self._wakeup.set()
+
+
+memory_ingest = MemoryIngestQueue(
+    workers=settings.MEM0_INGEST_WORKERS,
+    max_backlog=settings.MEM0_INGEST_MAX_BACKLOG,
+    max_batch_turns=settings.MEM0_INGEST_BATCH_TURNS,
+    drain_timeout=settings.MEM0_INGEST_DRAIN_TIMEOUT,
+)
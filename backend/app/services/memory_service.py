@@ -1,6 +1,7 @@
 from mem0 import MemoryClient
 from ..core.config import settings
-import asyncio
+from ..core.executors import get_executor
+from .memory_cache import memory_search_cache
 
 import random
 
@@ -15,19 +16,17 @@ class MemoryService:
             except Exception as e:
                 print(f"Failed to initialize Mem0 client: {e}")
 
-    async def get_random_memory(self, user_id: str) -> str:
+    async def get_memories(self, user_id: str) -> list:
+        """Text of the user's personal memories (may be empty)."""
         if not self.client:
             print("Mem0 client not initialized")
-            return None
+            return []
         
         try:
-            # Run sync client method in thread pool
-            loop = asyncio.get_event_loop()
-            
             print(f"Fetching memories for user: {user_id}")
             # Use search with a generic query "I" to find personal memories
-            memories = await loop.run_in_executor(
-                None,
+            # Run sync client method on the Mem0 executor lane
+            memories = await get_executor("mem0").run(
                 lambda: self.client.search(
                     query="User",
                     filters={"user_id": user_id}
@@ -36,38 +35,38 @@ class MemoryService:
             print(f"Memories fetched: {memories}")
             
             # memories is usually a list of dicts or a dict with 'results'
-            # If it's a list:
-            if isinstance(memories, list) and memories:
+            if isinstance(memories, dict) and "results" in memories:
+                memories = memories["results"]
+            if isinstance(memories, list):
                 # Filter for memories that are actual text
-                valid_memories = [m.get('memory') for m in memories if m.get('memory')]
-                if valid_memories:
-                    selected = random.choice(valid_memories)
-                    print(f"Selected memory: {selected}")
-                    return selected
-            
-            # If it's a dict with results
-            elif isinstance(memories, dict) and "results" in memories:
-                 valid_memories = [m.get('memory') for m in memories["results"] if m.get('memory')]
-                 if valid_memories:
-                    selected = random.choice(valid_memories)
-                    print(f"Selected memory: {selected}")
-                    return selected
-
-            print("No valid memories found")
-            return None
+                return [m.get('memory') for m in memories if m.get('memory')]
+            return []
         except Exception as e:
-            print(f"Error fetching random memory: {e}")
-            return None
+            print(f"Error fetching memories: {e}")
+            return []
+
+    async def get_random_memory(self, user_id: str) -> str:
+        valid_memories = await self.get_memories(user_id)
+        if valid_memories:
+            selected = random.choice(valid_memories)
+            print(f"Selected memory: {selected}")
+            return selected
+
+        print("No valid memories found")
+        return None
 
     async def get_therapeutic_context(self, user_id: str, user_message: str) -> str:
         if not self.client:
             return ""
+
+        # Near-duplicate queries since the user's last new memory are served locally
+        cached, query_embedding, lookup_started = await memory_search_cache.lookup(user_id, user_message)
+        if cached is not None:
+            return cached
         
         try:
-            # Run sync client method in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            relevant_memories = await loop.run_in_executor(
-                None,
+            # Run sync client method on the Mem0 executor lane to avoid blocking
+            relevant_memories = await get_executor("mem0").run(
                 lambda: self.client.search(
                     query=user_message,
                     version="v2",
@@ -96,31 +95,60 @@ class MemoryService:
                     if source and relationship and target:
                         context_str += f"- {source} {relationship} {target}\n"
             
+            memory_search_cache.store(user_id, query_embedding, context_str, lookup_started)
             return context_str
         except Exception as e:
             print(f"Error searching memories: {e}")
             return ""
 
-    async def save_interaction(self, user_id: str, user_message: str, assistant_response: str):
+    async def save_messages(self, user_id: str, messages: list, executor=None, deadline: bool = True):
+        """
+        One Mem0 add for `messages` on `executor` (a core.executors lane, "mem0"
+        by default); raises on failure (callers decide what to do). With
+        `deadline=False` it waits for the add however long it takes.
+        """
         if not self.client:
             return
 
+        # Run sync client method on the executor lane
+        await (executor or get_executor("mem0")).run(
+            lambda: self.client.add(
+                messages, 
+                user_id=user_id
+            ),
+            deadline=deadline,
+        )
+        # Cached searches for this user may now miss the new memories
+        memory_search_cache.invalidate(user_id)
+
+    async def save_interaction(self, user_id: str, user_message: str, assistant_response: str):
         try:
             messages = [
                 {"role": "user", "content": user_message},
                 {"role": "assistant", "content": assistant_response}
             ]
-            
-            # Run sync client method in thread pool
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.client.add(
-                    messages, 
-                    user_id=user_id
-                )
-            )
+            await self.save_messages(user_id, messages)
         except Exception as e:
             print(f"Error saving interaction to memory: {e}")
 
-memory_service = MemoryService()
+def create_memory_service():
+    """Memory backend selected by MEMORY_BACKEND: hosted Mem0 or the embedded local store."""
+    backend = settings.MEMORY_BACKEND.lower()
+    if backend == "local":
+        from .local_memory import LocalMemoryService
+        try:
+            service = LocalMemoryService(
+                settings.LOCAL_MEMORY_PATH,
+                top_k=settings.LOCAL_MEMORY_TOP_K,
+                min_score=settings.LOCAL_MEMORY_MIN_SCORE,
+                dedup_similarity=settings.LOCAL_MEMORY_DEDUP_SIMILARITY,
+            )
+            print(f"Local memory backend initialized at {settings.LOCAL_MEMORY_PATH}.")
+            return service
+        except Exception as e:
+            print(f"Failed to initialize local memory backend: {e}. Falling back to Mem0.")
+    elif backend != "mem0":
+        print(f"Unknown MEMORY_BACKEND '{settings.MEMORY_BACKEND}'. Using Mem0.")
+    return MemoryService()
+
+memory_service = create_memory_service()
@@ -1,9 +1,23 @@
+import hashlib
 import os
 import joblib
 import numpy as np
 import pandas as pd
 import shap
 
+ARTIFACT_FILES = {
+    'column_transformer': 'column_transformer.pkl',
+    'scaler': 'scaler.pkl',
+    'model': 'logistic_model.pkl',
+    'feature_names': 'feature_names.pkl',
+    'target_classes': 'target_classes.pkl',
+    'shap_bg': 'shap_background.npy',
+    'le_employment': 'le_employment.pkl',
+    'le_mental_illness': 'le_mental_illness.pkl',
+    'le_substance_abuse': 'le_substance_abuse.pkl',
+    'le_family_history': 'le_family_history.pkl',
+}
+
 # Global store for user risk profiles (In-memory for MVP)
 # Key: user_id, Value: dict with prediction and explanation
 user_risk_profiles = {}
@@ -27,29 +41,62 @@ class RiskAssessmentService:
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
         self.artifacts_dir = os.path.join(base_dir, 'logistic-regression-shap')
         
+        self.artifacts_version = None
+        self._artifacts_stat = None
+        self._load()
+
+    def _stat_artifacts(self):
+        return tuple(
+            (name, st.st_size, st.st_mtime_ns)
+            for name in sorted(ARTIFACT_FILES.values())
+            for st in [os.stat(os.path.join(self.artifacts_dir, name))]
+        )
+
+    def _load(self):
         try:
-            self.artifacts = {
-                'column_transformer': joblib.load(os.path.join(self.artifacts_dir, 'column_transformer.pkl')),
-                'scaler': joblib.load(os.path.join(self.artifacts_dir, 'scaler.pkl')),
-                'model': joblib.load(os.path.join(self.artifacts_dir, 'logistic_model.pkl')),
-                'feature_names': joblib.load(os.path.join(self.artifacts_dir, 'feature_names.pkl')),
-                'target_classes': joblib.load(os.path.join(self.artifacts_dir, 'target_classes.pkl')),
-                'shap_bg': joblib.load(os.path.join(self.artifacts_dir, 'shap_background.npy')),
-                'le_employment': joblib.load(os.path.join(self.artifacts_dir, 'le_employment.pkl')),
-                'le_mental_illness': joblib.load(os.path.join(self.artifacts_dir, 'le_mental_illness.pkl')),
-                'le_substance_abuse': joblib.load(os.path.join(self.artifacts_dir, 'le_substance_abuse.pkl')),
-                'le_family_history': joblib.load(os.path.join(self.artifacts_dir, 'le_family_history.pkl')),
+            artifacts = {
+                key: joblib.load(os.path.join(self.artifacts_dir, name))
+                for key, name in ARTIFACT_FILES.items()
             }
+            # Content hash of the artifacts; results cached under another version are never reused
+            digest = hashlib.sha256()
+            for name in sorted(ARTIFACT_FILES.values()):
+                with open(os.path.join(self.artifacts_dir, name), 'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+            # Swapped in whole: a prediction running now keeps the dict it started with
+            self.artifacts = artifacts
+            self.artifacts_version = digest.hexdigest()[:16]
+            self._artifacts_stat = self._stat_artifacts()
             self._initialized = True
             print("ML Artifacts Loaded Successfully.")
         except Exception as e:
+            # On a failed reload the previously loaded artifacts stay in use
             print(f"Error loading ML artifacts: {e}")
-            self._initialized = False
 
-    def process_input(self, raw_data):
-        """Transform raw dictionary input into scaled features."""
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the artifacts if the files on disk changed (e.g. a retrained model).
+        Returns True if reloaded. Blocking (file reads and hashing): run it on the
+        "models" executor lane.
+        """
+        try:
+            current = self._stat_artifacts()
+        except OSError:
+            return False
+        if current == self._artifacts_stat:
+            return False
+        print("ML artifacts changed on disk, reloading...")
+        # Don't retry on every call if the new files fail to load
+        self._artifacts_stat = current
+        self._load()
+        return True
+
+    def process_input(self, raw_data, artifacts: dict = None):
+        """Transform raw dictionary input into scaled features (with `artifacts`, by default the current ones)."""
         if not self._initialized:
             raise Exception("ML Service not initialized")
+        artifacts = artifacts or self.artifacts
 
         # 1. Convert to DataFrame
         df_input = pd.DataFrame([raw_data])
@@ -76,40 +123,42 @@ class RiskAssessmentService:
 
         # Apply encoders
         # Employment Status is at index 6
-        data[:, 6] = self.artifacts['le_employment'].transform(data[:, 6])
+        data[:, 6] = artifacts['le_employment'].transform(data[:, 6])
         # History of Mental Illness is at index 11
-        data[:, 11] = self.artifacts['le_mental_illness'].transform(data[:, 11])
+        data[:, 11] = artifacts['le_mental_illness'].transform(data[:, 11])
         # History of Substance Abuse is at index 12
-        data[:, 12] = self.artifacts['le_substance_abuse'].transform(data[:, 12])
+        data[:, 12] = artifacts['le_substance_abuse'].transform(data[:, 12])
         # Family History of Depression is at index 13
-        data[:, 13] = self.artifacts['le_family_history'].transform(data[:, 13])
+        data[:, 13] = artifacts['le_family_history'].transform(data[:, 13])
         
         # 3. Apply ColumnTransformer
-        X_enc = self.artifacts['column_transformer'].transform(data)
+        X_enc = artifacts['column_transformer'].transform(data)
         if hasattr(X_enc, "toarray"):
             X_enc = X_enc.toarray()
             
         # 4. Apply Scaler
-        X_scaled = self.artifacts['scaler'].transform(X_enc)
+        X_scaled = artifacts['scaler'].transform(X_enc)
         return X_scaled
 
     def predict_and_explain(self, user_data: dict):
         if not self._initialized:
             return {"error": "ML Service not initialized"}
 
+        # One reference for the whole call, so a concurrent reload can't mix old and new artifacts
+        artifacts = self.artifacts
         try:
-            X_processed = self.process_input(user_data)
+            X_processed = self.process_input(user_data, artifacts)
             
             # Predict
-            prob = self.artifacts['model'].predict_proba(X_processed)[0]
+            prob = artifacts['model'].predict_proba(X_processed)[0]
             pred_idx = np.argmax(prob)
-            pred_label = self.artifacts['target_classes'][pred_idx]
+            pred_label = artifacts['target_classes'][pred_idx]
             confidence = prob[pred_idx]
 
             # Explain
             explainer = shap.LinearExplainer(
-                self.artifacts['model'], 
-                self.artifacts['shap_bg'], 
+                artifacts['model'], 
+                artifacts['shap_bg'], 
                 feature_perturbation="interventional"
             )
             shap_values = explainer.shap_values(X_processed)
@@ -120,7 +169,7 @@ class RiskAssessmentService:
                 vals = shap_values
 
             # Create summary
-            feature_names = self.artifacts['feature_names']
+            feature_names = artifacts['feature_names']
             explanation_df = pd.DataFrame({
                 'feature': feature_names,
                 'shap_value': vals[0]
@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional
+from ..core.config import settings
+
+
+class MoodRingBuffer:
+    """
+    Hot tier for get_recent_moods: the last few moods per user, kept in memory.
+
+    A user's buffer is loaded from the DB on the first read and then appended to
+    by log_mood, so most reads never leave the process. The DB stays the source
+    of truth: buffers are reloaded after `ttl` seconds, users idle for longer than
+    `idle_timeout` are dropped, and at most `max_users` buffers are kept (LRU).
+    """
+
+    def __init__(self, capacity: int, max_users: int, idle_timeout: float, ttl: float):
+        self.capacity = capacity
+        self.max_users = max_users
+        self.idle_timeout = idle_timeout
+        self.ttl = ttl
+        # user_id -> {"moods": deque, "loaded_at": float, "last_access": float}
+        self._users = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, user_id: str, limit: int) -> Optional[List[dict]]:
+        """Newest-first moods, or None if the user isn't loaded (or the buffer can't answer)."""
+        entry = self._users.get(user_id)
+        now = time.monotonic()
+        if entry is None or limit > self.capacity or now - entry["loaded_at"] > self.ttl:
+            self.misses += 1
+            return None
+        entry["last_access"] = now
+        self._users.move_to_end(user_id)
+        self.hits += 1
+        moods = list(entry["moods"])[-limit:]
+        return [dict(m) for m in reversed(moods)]
+
+    def load(self, user_id: str, newest_first: List[dict]):
+        """Seeds a user's buffer from a DB read (newest first, as the repository returns it)."""
+        now = time.monotonic()
+        moods = deque(
+            ({"emotion": m.get("emotion"), "created_at": m.get("created_at")} for m in reversed(newest_first[:self.capacity])),
+            maxlen=self.capacity
+        )
+        self._users[user_id] = {"moods": moods, "loaded_at": now, "last_access": now}
+        self._users.move_to_end(user_id)
+        self._evict(now)
+
+    def append(self, user_id: str, emotion: str, created_at: str = None):
+        """Records a new mood. Users that aren't loaded are left alone; their next read loads them."""
+        entry = self._users.get(user_id)
+        if entry is not None:
+            entry["moods"].append({"emotion": emotion, "created_at": created_at})
+
+    def _evict(self, now: float):
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self.evictions += 1
+        # Oldest-accessed users sit at the front, so stop at the first active one
+        while self._users:
+            user_id, entry = next(iter(self._users.items()))
+            if now - entry["last_access"] <= self.idle_timeout:
+                break
+            del self._users[user_id]
+            self.evictions += 1
+
+
+mood_cache = MoodRingBuffer(
+    capacity=settings.MOOD_CACHE_SIZE,
+    max_users=settings.MOOD_CACHE_MAX_USERS,
+    idle_timeout=settings.MOOD_CACHE_IDLE_SECONDS,
+    ttl=settings.MOOD_CACHE_TTL_SECONDS,
+)
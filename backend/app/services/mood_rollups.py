@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import List
+
+# Emotion to Valence Mapping (1-10)
+EMOTION_VALENCE = {
+    "joy": 9, "love": 9, "admiration": 8, "optimism": 8, "caring": 8, "excitement": 9, "gratitude": 9, "pride": 8, "relief": 7,
+    "neutral": 6, "realization": 6, "surprise": 6, "curiosity": 7, "approval": 7, "desire": 6,
+    "sadness": 3, "anger": 2, "fear": 2, "disgust": 1, "grief": 1, "remorse": 2, "embarrassment": 3, "disappointment": 3, "annoyance": 3, "nervousness": 4, "confusion": 5
+}
+
+# Score for emotions missing from the table above
+DEFAULT_VALENCE = 5
+
+
+def emotion_valence(emotion) -> float:
+    """Valence of one logged emotion; a log without one scores DEFAULT_VALENCE, as the dashboard always has."""
+    return EMOTION_VALENCE.get(emotion, DEFAULT_VALENCE)
+
+
+def mood_day(created_at: str) -> str:
+    """UTC calendar day ("YYYY-MM-DD") a mood_logs timestamp falls on."""
+    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).date().isoformat()
+
+
+def rollup_mood_rows(rows: List[dict], totals: dict = None) -> dict:
+    """
+    Folds mood_logs rows into per-user, per-day sums keyed by (user_id, day).
+    Pass `totals` to keep accumulating into an existing result.
+    """
+    totals = {} if totals is None else totals
+    for row in rows:
+        key = (row["user_id"], mood_day(row["created_at"]))
+        bucket = totals.get(key)
+        if bucket is None:
+            bucket = totals[key] = {
+                "user_id": key[0], "day": key[1],
+                "valence_sum": 0.0, "log_count": 0, "intensity_sum": 0.0
+            }
+        bucket["valence_sum"] += emotion_valence(row.get("emotion"))
+        bucket["log_count"] += 1
+        # Older logs have no intensity; count them as 0 like the dashboard always has
+        bucket["intensity_sum"] += row.get("intensity") or 0.0
+    return totals
@@ -1,9 +1,15 @@
-from ..core.database import get_supabase
-from datetime import datetime
+from ..core.database import get_repository, run_query
+from .mood_writer import mood_writer
+from .mood_cache import mood_cache
+from .dashboard_events import dashboard_events
+from datetime import datetime, timezone
+
+def _mood_key(r: dict):
+    return datetime.fromisoformat(r["created_at"].replace('Z', '+00:00')), r.get("emotion")
 
 async def log_mood(user_id: str, emotion: str, text: str, intensity: float = None):
-    supabase = get_supabase()
-    if not supabase:
+    repo = get_repository()
+    if not repo:
         print(f"[MOCK DB] Logging mood for {user_id}: {emotion} (Intensity: {intensity})")
         return
 
@@ -11,29 +17,50 @@ async def log_mood(user_id: str, emotion: str, text: str, intensity: float = Non
         "user_id": user_id,
         "emotion": emotion,
         "note": text,
-        "intensity": intensity
-        # "created_at" is handled by default in DB, but we can send it if we want.
-        # Let's let the DB handle it to match the schema default.
+        "intensity": intensity,
+        # Stamp the record here: it is written in a later batch, so the DB default
+        # would record the flush time instead of the time of the turn.
+        "created_at": datetime.now(timezone.utc).isoformat()
     }
-    try:
-        supabase.table("mood_logs").insert(data).execute()
-    except Exception as e:
-        print(f"Error logging mood: {e}")
+    mood_cache.append(user_id, emotion, data["created_at"])
+    # Non-UUID guest IDs stay in memory only (user_id is a uuid column); they aren't
+    # published either, since a dashboard only shows what is persisted
+    if len(user_id) != 36:
+        return
+    # Queued for a bulk insert by the background writer; never blocks the turn.
+    # Enqueued and published together, so a dashboard snapshot (see analytics)
+    # holds exactly the moods stamped before its watermark.
+    mood_writer.enqueue(data)
+    dashboard_events.publish(user_id, {
+        "emotion": emotion,
+        "intensity": intensity,
+        "created_at": data["created_at"]
+    })
 
 async def get_recent_moods(user_id: str, limit: int = 5):
-    supabase = get_supabase()
-    if not supabase:
+    repo = get_repository()
+    if not repo:
         # Return mock data for testing logic
         return [{"emotion": "neutral"}] * limit
 
+    cached = mood_cache.get(user_id, limit)
+    if cached is not None:
+        return cached
+
+    # Miss: read enough to fill the user's ring buffer, not just this request.
+    # Moods still sitting in the write-behind queue are newer than anything in the DB;
+    # snapshotted before the DB read, and any that commit in between are dropped below.
+    want = max(limit, mood_cache.capacity)
+    pending = [{"emotion": r["emotion"], "created_at": r["created_at"]} for r in reversed(mood_writer.pending_for(user_id))][:want]
     try:
-        response = supabase.table("mood_logs")\
-            .select("emotion")\
-            .eq("user_id", user_id)\
-            .order("created_at", desc=True)\
-            .limit(limit)\
-            .execute()
-        return response.data
+        rows = []
+        if len(pending) < want:
+            rows = await run_query("mood_logs.recent", lambda: repo.fetch_recent_moods(user_id, want))
+            stored = {_mood_key(r) for r in rows}
+            pending = [r for r in pending if _mood_key(r) not in stored]
+        moods = (pending + rows)[:want]
+        mood_cache.load(user_id, moods)
+        return moods[:limit]
     except Exception as e:
         print(f"Error fetching moods: {e}")
-        return []
+        return pending[:limit]
@@ -0,0 +1,145 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+import pandas as pd
+from ..core.config import settings
+from ..core.database import get_repository, run_query
+from .mood_rollups import EMOTION_VALENCE, DEFAULT_VALENCE
+
+BUCKETS = ("hour", "day", "week", "month")
+
+SUM_COLUMNS = ["valence_sum", "intensity_sum", "log_count"]
+
+
+def _bucket_start(local_times: pd.Series, bucket: str) -> pd.Series:
+    """Start of the bucket each (naive, local wall-clock) timestamp falls in."""
+    if bucket == "hour":
+        return local_times.dt.floor("h")
+    if bucket == "day":
+        return local_times.dt.normalize()
+    if bucket == "week":
+        return local_times.dt.normalize() - pd.to_timedelta(local_times.dt.weekday, unit="D")
+    return local_times.dt.to_period("M").dt.start_time
+
+
+def _aggregate_logs(rows: List[dict], tz: ZoneInfo, bucket: str) -> pd.DataFrame:
+    """One vectorized pass over a chunk of raw logs: valence and intensity sums per bucket."""
+    df = pd.DataFrame.from_records(rows, columns=["emotion", "intensity", "created_at"])
+    local = pd.to_datetime(df["created_at"], utc=True, format="ISO8601").dt.tz_convert(tz).dt.tz_localize(None)
+    frame = pd.DataFrame({
+        "bucket": _bucket_start(local, bucket),
+        "valence_sum": df["emotion"].map(EMOTION_VALENCE).fillna(DEFAULT_VALENCE).astype(float),
+        # Older logs have no intensity; count them as 0 like the dashboard does
+        "intensity_sum": pd.to_numeric(df["intensity"], errors="coerce").fillna(0.0),
+        "log_count": 1,
+    })
+    return frame.groupby("bucket")[SUM_COLUMNS].sum()
+
+
+def _aggregate_rollups(rows: List[dict], bucket: str) -> pd.DataFrame:
+    """Re-buckets UTC daily rollups into day/week/month buckets."""
+    df = pd.DataFrame.from_records(rows, columns=["day", "valence_sum", "log_count", "intensity_sum"])
+    frame = pd.DataFrame({
+        "bucket": _bucket_start(pd.to_datetime(df["day"].astype(str)), bucket),
+        "valence_sum": df["valence_sum"].astype(float),
+        "intensity_sum": df["intensity_sum"].astype(float),
+        "log_count": df["log_count"].astype(int),
+    })
+    return frame.groupby("bucket")[SUM_COLUMNS].sum()
+
+
+def _downsample(totals: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """Merges runs of adjacent buckets so at most max_points remain. Sums keep the averages exact."""
+    if len(totals) <= max_points:
+        return totals
+    group_size = math.ceil(len(totals) / max_points)
+    groups = pd.Series(range(len(totals)), index=totals.index) // group_size
+    merged = totals.groupby(groups.values)[SUM_COLUMNS].sum()
+    merged.index = totals.index.to_series().groupby(groups.values).first()
+    return merged
+
+
+def _utc_midnight_on_or_after(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    midnight = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight if midnight == value else midnight + timedelta(days=1)
+
+
+def _utc_midnight_on_or_before(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _combine(totals: Optional[pd.DataFrame], chunk: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if chunk is None:
+        return totals
+    return chunk if totals is None else totals.add(chunk, fill_value=0)
+
+
+async def _aggregate_log_range(repo, user_id: str, start: datetime, end: datetime, tz: ZoneInfo, bucket: str) -> Optional[pd.DataFrame]:
+    """Streams the raw logs for start <= t < end in chunks, folding each into per-bucket sums."""
+    start_utc = start.astimezone(timezone.utc).isoformat()
+    end_utc = end.astimezone(timezone.utc).isoformat()
+    totals = None
+    after = None
+    while True:
+        page = await run_query(
+            "mood_logs.trends",
+            lambda: repo.fetch_user_mood_logs_page(user_id, start_utc, end_utc, after, settings.ANALYTICS_CHUNK_SIZE)
+        )
+        if not page:
+            break
+        # Fold each chunk into the running totals so only per-bucket sums are held
+        totals = _combine(totals, _aggregate_logs(page, tz, bucket))
+        # Page until one comes back empty: Supabase caps a response (1000 rows by
+        # default), so a short page doesn't mean the range is exhausted
+        after = (page[-1]["created_at"], page[-1]["id"])
+    return totals
+
+
+async def get_mood_trends(user_id: str, start: datetime, end: datetime, bucket: str, tz: ZoneInfo, max_points: int) -> List[dict]:
+    """
+    Average mood (valence 1-10) and stress (intensity 0-100) per bucket for
+    start <= t < end, as sparse points (buckets without logs are omitted).
+
+    For whole-day buckets in UTC, the full UTC days inside the range come from
+    mood_daily_rollups and only the partial days at either end (if the bounds
+    aren't at midnight) are read from raw logs. Anything else streams raw logs
+    in chunks so memory stays bounded by the number of buckets.
+    """
+    repo = get_repository()
+    if not repo:
+        return []
+
+    totals = None
+    first_midnight = _utc_midnight_on_or_after(start)
+    last_midnight = _utc_midnight_on_or_before(end)
+    if bucket != "hour" and tz.key == "UTC" and first_midnight < last_midnight:
+        first_day = first_midnight.date().isoformat()
+        last_day = (last_midnight - timedelta(days=1)).date().isoformat()
+        rollups = await run_query("mood_daily_rollups.trends", lambda: repo.fetch_mood_rollups(user_id, first_day))
+        rollups = [r for r in rollups if str(r["day"]) <= last_day]
+        if rollups:
+            totals = _aggregate_rollups(rollups, bucket)
+        # A rollup covers a whole day, so partial days at the edges come from the logs
+        if start < first_midnight:
+            totals = _combine(totals, await _aggregate_log_range(repo, user_id, start, first_midnight, tz, bucket))
+        if last_midnight < end:
+            totals = _combine(totals, await _aggregate_log_range(repo, user_id, last_midnight, end, tz, bucket))
+    else:
+        totals = await _aggregate_log_range(repo, user_id, start, end, tz, bucket)
+
+    if totals is None or totals.empty:
+        return []
+
+    totals = _downsample(totals.sort_index(), max_points)
+
+    return [
+        {
+            "t": ts.isoformat(),
+            "mood": round(row.valence_sum / row.log_count, 1),
+            "stress": round(row.intensity_sum * 100 / row.log_count, 1),
+            "count": int(row.log_count),
+        }
+        for ts, row in zip(totals.index, totals.itertuples(index=False))
+    ]
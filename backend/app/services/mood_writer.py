@@ -0,0 +1,27 @@
+from ..core.config import settings
+from .write_behind import WriteBehindWriter
+from .mood_rollups import rollup_mood_rows
+
+
+class MoodLogWriter(WriteBehindWriter):
+    table = "mood_logs"
+
+    def _insert(self, repo, batch: list):
+        repo.insert_mood_logs(batch)
+        # Keep the daily rollups in step; as with chat_sessions a failure here must not
+        # fail (and re-insert) the batch. The backfill job can rebuild them.
+        try:
+            repo.upsert_mood_rollups(list(rollup_mood_rows(batch).values()))
+        except Exception as e:
+            print(f"Error updating mood rollups: {e}")
+
+    def pending_for(self, user_id: str) -> list:
+        return self.pending("user_id", user_id)
+
+
+mood_writer = MoodLogWriter(
+    batch_size=settings.MOOD_FLUSH_BATCH_SIZE,
+    flush_interval=settings.MOOD_FLUSH_INTERVAL,
+    max_queue=settings.MOOD_QUEUE_MAX,
+    max_retries=settings.MOOD_FLUSH_RETRIES,
+)
@@ -0,0 +1,156 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from ..core.config import settings
+from .context_window import apply_compaction
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+# Rough per-message overhead on top of the text (message object, dict, strings)
+MESSAGE_OVERHEAD_BYTES = 400
+
+
+class SessionStateStore:
+    """
+    In-process cache of chat session state, so a websocket reconnect resumes
+    without reading history back from the database.
+
+    Per session it keeps the graph state as of the last completed turn (the
+    compacted message window, conversation summary, last_recommendation,
+    emotion fields, ...) and the newest page of history for the client's
+    "history" frame, kept current as turns are recorded. Entries are only
+    returned to the user that owns them. Sessions idle for `idle_ttl` seconds
+    are evicted, and least recently used sessions are dropped beyond
+    `max_sessions` or an approximate total of `max_bytes`.
+    """
+
+    def __init__(self, max_sessions: int, max_bytes: int, idle_ttl: float, page_size: int):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.page_size = page_size
+        # session_id -> {"user_id", "state", "page", "cursor", "bytes", "touched_at"}
+        self._sessions = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "approx_bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, session_id: str, user_id: str) -> Optional[dict]:
+        """
+        {"state", "page", "cursor"} for a resumable session, or None. The state's
+        message list is a copy, so the caller can keep appending to it.
+        """
+        self._evict_idle()
+        entry = self._sessions.get(session_id)
+        if entry is None or entry["user_id"] != user_id:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["touched_at"] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        state = dict(entry["state"])
+        state["messages"] = list(state["messages"])
+        return {"state": state, "page": list(entry["page"]), "cursor": entry["cursor"]}
+
+    def put(self, session_id: str, user_id: str, state: dict, page: list, cursor: Optional[dict]):
+        """Records the state after a connect or a completed turn, with the client's newest history page."""
+        snapshot = dict(state)
+        snapshot["messages"] = list(state["messages"])
+        self._store(session_id, {
+            "user_id": user_id,
+            "state": snapshot,
+            "page": list(page),
+            "cursor": cursor,
+        })
+
+    def record_turn(self, session_id: str, user_id: str, state: dict, records: list):
+        """put() after a turn, adding its chat_history records to the cached history page."""
+        entry = self._sessions.get(session_id)
+        if entry is None or entry["user_id"] != user_id:
+            return
+        page = entry["page"] + records
+        cursor = entry["cursor"]
+        if len(page) > self.page_size:
+            cut = len(page) - self.page_size
+            if page[cut].get("id") is None:
+                # Records saved this connection have no id yet, and an id-less cursor means
+                # "strictly older than created_at": keep rows sharing that timestamp together
+                while cut > 0 and _parse_ts(page[cut - 1]["created_at"]) == _parse_ts(page[cut]["created_at"]):
+                    cut -= 1
+            page = page[cut:]
+            # Older messages now start before the page's first row
+            cursor = {"before": page[0]["created_at"], "before_id": page[0].get("id")}
+        self.put(session_id, user_id, state, page, cursor)
+
+    def compacted(self, session_id: str, user_id: str, compaction: tuple):
+        """Folds a background compaction (see context_window) into the cached state, if it still applies."""
+        entry = self._sessions.get(session_id)
+        if entry is None or entry["user_id"] != user_id:
+            return
+        messages = apply_compaction(entry["state"]["messages"], compaction)
+        if messages is None:
+            return
+        entry["state"]["messages"] = messages
+        entry["state"]["conversation_summary"] = compaction[2]
+        self._bytes -= entry["bytes"]
+        entry["bytes"] = self._size(entry)
+        self._bytes += entry["bytes"]
+
+    def invalidate(self, session_id: str):
+        """Drops a session whose cached entry no longer matches what was saved (e.g. a turn cut short)."""
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry["bytes"]
+
+    def _size(self, entry: dict) -> int:
+        state = entry["state"]
+        size = sum(len(str(m.content)) + MESSAGE_OVERHEAD_BYTES for m in state["messages"])
+        size += sum(len(r["content"]) + MESSAGE_OVERHEAD_BYTES for r in entry["page"])
+        size += sum(len(v) for v in state.values() if isinstance(v, str))
+        return size
+
+    def _store(self, session_id: str, entry: dict):
+        self._evict_idle()
+        old = self._sessions.pop(session_id, None)
+        if old is not None:
+            self._bytes -= old["bytes"]
+        entry["bytes"] = self._size(entry)
+        entry["touched_at"] = time.monotonic()
+        self._sessions[session_id] = entry
+        self._bytes += entry["bytes"]
+        while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        _, entry = self._sessions.popitem(last=False)
+        self._bytes -= entry["bytes"]
+        self.evictions += 1
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        # Oldest first, so stop at the first session still in use
+        while self._sessions and next(iter(self._sessions.values()))["touched_at"] < cutoff:
+            self._drop_oldest()
+
+
+session_store = SessionStateStore(
+    max_sessions=settings.SESSION_STATE_MAX_SESSIONS,
+    max_bytes=settings.SESSION_STATE_MAX_MB * 1024 * 1024,
+    idle_ttl=settings.SESSION_STATE_IDLE_SECONDS,
+    page_size=settings.HISTORY_PAGE_SIZE,
+)
@@ -0,0 +1,135 @@
+import asyncio
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from langchain_core.messages import HumanMessage, SystemMessage
+from ..core.config import settings
+from ..core.llm_scheduler import llm_scheduler
+from .memory_service import memory_service
+
+DEFAULT_STARTER = "Hi there! How are you feeling today?"
+
+STARTER_PROMPT = """
+The user has these memories:
+{memories}
+Write {count} different short, warm, and empathetic opening messages for a new chat session.
+Each should gently reference one of the memories.
+Example: If memory is "scared of exams", say "Hey, I was thinking about you. How is the exam prep going?"
+Keep each under 20 words. Put each message on its own line, with no numbering or quotes.
+"""
+
+_LIST_MARKER = re.compile(r"^(?:[-*\u2022]|\d+[.)])\s*")
+
+
+def clean_starter(message: str) -> str:
+    message = _LIST_MARKER.sub("", message.strip())
+    # Remove surrounding single or double quotes if present
+    if len(message) >= 2 and message[0] == message[-1] and message[0] in ('"', "'"):
+        message = message[1:-1]
+    return message
+
+
+class StarterPool:
+    """
+    Ready-made session starters per user, so /chat/starter is a memory read.
+
+    A pool of `pool_size` starters is generated in the background (one Mem0
+    read, one low-priority LLM call) when a chat session ends or new memories
+    are saved, and expires after `ttl` seconds. Each starter is handed out
+    once; an emptied pool is refilled in the background. At most `max_users`
+    pools are kept (LRU).
+    """
+
+    def __init__(self, pool_size: int, ttl: float, max_users: int, min_refresh_interval: float):
+        self.pool_size = pool_size
+        self.ttl = ttl
+        self.max_users = max_users
+        self.min_refresh_interval = min_refresh_interval
+        # user_id -> {"starters": list, "has_memories": bool, "generated_at": float}
+        self._pools = OrderedDict()
+        self._refreshing = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._pools),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+    def take(self, user_id: str) -> Optional[str]:
+        """A precomputed starter, or None on a miss (no pool, expired, or used up)."""
+        entry = self._pools.get(user_id)
+        if entry is None or time.monotonic() - entry["generated_at"] > self.ttl:
+            self.misses += 1
+            return None
+        if not entry["has_memories"]:
+            # Nothing to personalise with yet
+            self.hits += 1
+            return DEFAULT_STARTER
+        if not entry["starters"]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pools.move_to_end(user_id)
+        starter = entry["starters"].pop()
+        if not entry["starters"]:
+            self.schedule_refresh(user_id)
+        return starter
+
+    def schedule_refresh(self, user_id: str, debounce: bool = False):
+        """
+        Regenerates the user's pool in the background. With `debounce`, a pool
+        younger than min_refresh_interval is kept (used on every memory save).
+        """
+        if user_id in self._refreshing:
+            return
+        entry = self._pools.get(user_id)
+        if debounce and entry and time.monotonic() - entry["generated_at"] < self.min_refresh_interval:
+            return
+        self._refreshing[user_id] = asyncio.create_task(self._refresh(user_id))
+
+    async def _refresh(self, user_id: str):
+        try:
+            memories = await memory_service.get_memories(user_id)
+            starters = await self._generate(memories) if memories else []
+            self._pools[user_id] = {
+                "starters": starters,
+                "has_memories": bool(memories),
+                "generated_at": time.monotonic(),
+            }
+            self._pools.move_to_end(user_id)
+            while len(self._pools) > self.max_users:
+                self._pools.popitem(last=False)
+            self.refreshes += 1
+        except Exception as e:
+            print(f"Error precomputing starters: {e}")
+        finally:
+            self._refreshing.pop(user_id, None)
+
+    async def _generate(self, memories: List[str]) -> List[str]:
+        sample = random.sample(memories, min(len(memories), self.pool_size))
+        prompt = STARTER_PROMPT.format(
+            memories="\n".join(f'- "{m}"' for m in sample),
+            count=self.pool_size,
+        )
+        response = await llm_scheduler.ainvoke([
+            SystemMessage(content="You are a supportive friend."),
+            HumanMessage(content=prompt),
+        ], priority="analytics")
+        starters = [clean_starter(line) for line in response.content.splitlines()]
+        return [s for s in starters if s][:self.pool_size]
+
+
+starter_pool = StarterPool(
+    pool_size=settings.STARTER_POOL_SIZE,
+    ttl=settings.STARTER_TTL_SECONDS,
+    max_users=settings.STARTER_MAX_USERS,
+    min_refresh_interval=settings.STARTER_REFRESH_MIN_INTERVAL,
+)
@@ -1,10 +1,10 @@
-from ..core.database import get_supabase
+from ..core.database import get_repository, run_query
 import json
 
 async def save_user_assessment(user_id: str, data: dict):
-    supabase = get_supabase()
-    if not supabase:
-        print("Supabase not initialized")
+    repo = get_repository()
+    if not repo:
+        print("Database not initialized")
         return None
     
     try:
@@ -18,28 +18,18 @@ async def save_user_assessment(user_id: str, data: dict):
             "llm_summary": data.get("llm_analysis")
         }
         
-        response = supabase.table("user_assessments").insert(record).execute()
-        return response.data
+        return await run_query("user_assessments.insert", lambda: repo.insert_assessment(record), deadline=False)
     except Exception as e:
         print(f"Error saving assessment: {e}")
         return None
 
 async def get_latest_assessment(user_id: str):
-    supabase = get_supabase()
-    if not supabase:
+    repo = get_repository()
+    if not repo:
         return None
     
     try:
-        response = supabase.table("user_assessments")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .order("created_at", desc=True)\
-            .limit(1)\
-            .execute()
-            
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-        return None
+        return await run_query("user_assessments.latest", lambda: repo.fetch_latest_assessment(user_id))
     except Exception as e:
         print(f"Error fetching assessment: {e}")
         return None
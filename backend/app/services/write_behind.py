@@ -0,0 +1,194 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from ..core.database import get_repository, run_query
+
+
+class WriteBehindWriter(ABC):
+    """
+    Write-behind buffer for one table.
+    Records are queued in memory and flushed as one bulk insert when the batch
+    fills up or the flush interval elapses, so chat turns never wait on the DB.
+    Batches are written strictly in enqueue order. A batch that still fails
+    after its retries is written row by row: rows that go through are kept,
+    rows the DB rejected (Repository.is_rejected: a constraint or invalid
+    value) are dead-lettered (counted, logged and kept in `dead_letters`) so
+    one bad row can't hold up everything queued behind it. Rows that failed
+    for any other reason (outage, timeout, server error) go back to the front
+    of the queue and are retried on the next tick, however long that takes.
+    Subclasses set `table` and implement `_insert`.
+    """
+
+    table = ""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, max_retries: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+
+        self._queue = deque()
+        self._inflight = []
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self._flush_lock = asyncio.Lock()
+        self.dead_letters = deque(maxlen=100)  # most recent rejected records
+
+        # Counters for monitoring
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    def enqueue(self, record: dict):
+        if len(self._queue) >= self.max_queue:
+            # Shed the oldest record rather than block the chat turn
+            self._queue.popleft()
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"{self.table} write queue full ({self.max_queue}); dropping oldest records ({self.dropped} so far)")
+        self._queue.append(record)
+
+        self._ensure_started()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self, field: str, value) -> list:
+        """
+        Records with `field == value` that are queued but not yet written (oldest
+        first). Take this before reading the table: a batch committing in between
+        then shows up in both, and the caller drops the duplicates.
+        """
+        return [r for r in self._inflight + list(self._queue) if r.get(field) == value]
+
+    async def read_with_pending(self, read, field: str, value):
+        """
+        (await read(), pending(field, value)) with no batch committing in between,
+        so each record shows up in exactly one of the two. Waits for a batch
+        being written to finish first.
+        """
+        async with self._flush_lock:
+            return await read(), self.pending(field, value)
+
+    def _ensure_started(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def start(self):
+        self._ensure_started()
+
+    async def stop(self):
+        """Stop the background loop and flush whatever is still queued."""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def flush_soon(self):
+        """Wakes the background loop for an early flush without waiting for it."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self):
+        # Serialised so an on-demand flush can't interleave batches with the background loop
+        async with self._flush_lock:
+            await self._drain()
+
+    async def _drain(self):
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._inflight = batch
+            ok = await self._write_batch(batch)
+            if not ok and not self._stopping:
+                batch = await self._write_rows(batch)
+                ok = not batch
+            self._inflight = []
+            if ok:
+                continue
+            if self._stopping:
+                # Shutting down: nothing left to retry on, give up on this batch
+                self.failed += len(batch)
+                continue
+            # Put the batch back at the front so ordering is preserved and try again next tick
+            self._queue.extendleft(reversed(batch))
+            return
+
+    async def _write_batch(self, batch: list) -> bool:
+        repo = get_repository()
+        if not repo:
+            return True
+
+        delay = 0.5
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await run_query(f"{self.table}.bulk_insert", lambda: self._insert(repo, batch), deadline=False)
+                self.flushed += len(batch)
+                return True
+            except Exception as e:
+                print(f"Error flushing {len(batch)} {self.table} rows (attempt {attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        return False
+
+    async def _write_rows(self, batch: list) -> list:
+        """Writes a failed batch one row at a time; returns the rows to retry later."""
+        repo = get_repository()
+        failed = []
+        for record in batch:
+            try:
+                await run_query(f"{self.table}.insert_row", lambda record=record: self._insert(repo, [record]), deadline=False)
+                self.flushed += 1
+            except Exception as e:
+                failed.append((record, e))
+
+        retry = []
+        for record, e in failed:
+            if repo.is_rejected(e):
+                self._dead_letter(record, e)
+            else:
+                # Outage or server error: the row itself may be fine, keep it for the next tick
+                retry.append(record)
+        return retry
+
+    def _dead_letter(self, record: dict, error: Exception):
+        self.dead_lettered += 1
+        self.dead_letters.append(record)
+        print(f"Dropping {self.table} row the DB rejected ({error}): {record}")
+
+    @abstractmethod
+    def _insert(self, repo, batch: list):
+        """Writes one batch (blocking, on the DB lane); raises on failure."""
@@ -0,0 +1,36 @@
+-- Summary index over chat_history, one row per session (used for the sidebar).
+-- Maintained incrementally by the chat_history writer; backfill with
+-- `python -m app.jobs.backfill_sessions`.
+create table if not exists chat_sessions (
+    session_id text primary key,
+    user_id uuid not null,
+    preview text,
+    last_message_at timestamptz not null,
+    message_count integer not null default 0
+);
+
+create index if not exists idx_chat_sessions_user
+    on chat_sessions (user_id, last_message_at desc, session_id desc);
+
+create index if not exists idx_chat_history_created
+    on chat_history (created_at, id);
+
+-- Applies a batch of per-session deltas from the chat_history writer atomically:
+-- message_count is incremented in the upsert itself, so concurrent writers,
+-- processes and the backfill never lose counts to a read-then-write race.
+-- Each delta: {session_id, user_id, preview, last_message_at, message_count}.
+create or replace function apply_session_activity(deltas jsonb)
+returns void
+language sql
+as $$
+    insert into chat_sessions (session_id, user_id, preview, last_message_at, message_count)
+    select d.session_id, d.user_id, d.preview, d.last_message_at, d.message_count
+    from jsonb_to_recordset(deltas)
+        as d(session_id text, user_id uuid, preview text, last_message_at timestamptz, message_count integer)
+    on conflict (session_id) do update set
+        -- A batch that lands late must not roll the preview back
+        preview = case when excluded.last_message_at >= chat_sessions.last_message_at
+                       then excluded.preview else chat_sessions.preview end,
+        last_message_at = greatest(chat_sessions.last_message_at, excluded.last_message_at),
+        message_count = chat_sessions.message_count + excluded.message_count;
+$$;
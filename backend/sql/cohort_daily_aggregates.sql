@@ -0,0 +1,9 @@
+-- Population-level analytics, one mergeable aggregate per UTC day.
+-- Written by `python -m app.jobs.cohort_analytics`.
+create table if not exists cohort_daily_aggregates (
+    day date primary key,
+    payload jsonb not null
+);
+
+create index if not exists idx_user_assessments_created
+    on user_assessments (created_at, id);
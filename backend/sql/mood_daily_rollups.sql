@@ -0,0 +1,31 @@
+-- Per-user, per-UTC-day aggregates of mood_logs for the analytics dashboard.
+-- Maintained incrementally by the mood_logs writer; backfill with
+-- `python -m app.jobs.backfill_mood_rollups`.
+create table if not exists mood_daily_rollups (
+    user_id uuid not null,
+    day date not null,
+    valence_sum double precision not null default 0,
+    log_count integer not null default 0,
+    intensity_sum double precision not null default 0,
+    primary key (user_id, day)
+);
+
+create index if not exists idx_mood_logs_created
+    on mood_logs (created_at, id);
+
+-- Applies a batch of per-user, per-day deltas from the mood_logs writer atomically
+-- (the sums are incremented inside the upsert, so concurrent writers and the
+-- backfill can't lose updates). Each delta: {user_id, day, valence_sum, log_count, intensity_sum}.
+create or replace function apply_mood_rollups(deltas jsonb)
+returns void
+language sql
+as $$
+    insert into mood_daily_rollups (user_id, day, valence_sum, log_count, intensity_sum)
+    select d.user_id, d.day, d.valence_sum, d.log_count, d.intensity_sum
+    from jsonb_to_recordset(deltas)
+        as d(user_id uuid, day date, valence_sum double precision, log_count integer, intensity_sum double precision)
+    on conflict (user_id, day) do update set
+        valence_sum = mood_daily_rollups.valence_sum + excluded.valence_sum,
+        log_count = mood_daily_rollups.log_count + excluded.log_count,
+        intensity_sum = mood_daily_rollups.intensity_sum + excluded.intensity_sum;
+$$;
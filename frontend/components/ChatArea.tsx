@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { Send, Mic, MicOff, X } from 'lucide-react';
-import { Message } from '../types';
+import { Message, HistoryCursor } from '../types';
 import { Button } from './Button';
 import { webSocketService } from '../services/websocketService';
 import { GeminiLiveService } from '../services/gemini-live';
@@ -20,6 +20,9 @@ Listen more than you speak. Ask open-ended questions. Validate feelings.
 If someone expresses distress, be supportive but encourage professional help if needed.
 Never be judgmental. Always be kind and understanding.`;
 
+// Id of the bot bubble being filled by streamed "delta" frames
+const STREAMING_ID = 'streaming';
+
 const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDarkMode, sessionId }) => {
   const [messages, setMessages] = useState<Message[]>([
     {
@@ -29,6 +32,7 @@ const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDark
       timestamp: new Date()
     }
   ]);
+  const [historyCursor, setHistoryCursor] = useState<HistoryCursor | null>(null);
   const [inputText, setInputText] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [voiceStatus, setVoiceStatus] = useState<'ready' | 'listening' | 'speaking' | 'connecting'>('ready');
@@ -49,6 +53,7 @@ const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDark
     }
     
     // Reset to default initially
+    setHistoryCursor(null);
     setMessages([{
       id: 'init-1',
       role: 'model',
@@ -79,16 +84,29 @@ const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDark
       try {
         const parsed = JSON.parse(eventData);
         
-        if (parsed.type === 'history') {
+        if (parsed.type === 'history' || parsed.type === 'history_page') {
           const historyMessages = parsed.data.map((msg: any) => ({
             id: Math.random().toString(),
             role: msg.role,
             text: msg.content,
             timestamp: new Date(msg.timestamp)
           }));
-          if (historyMessages.length > 0) {
+          setHistoryCursor(parsed.cursor || null);
+          if (parsed.type === 'history_page') {
+            setMessages(prev => [...historyMessages, ...prev]);
+          } else if (historyMessages.length > 0) {
             setMessages(historyMessages);
           }
+        } else if (parsed.type === 'delta') {
+          // Streamed tokens: grow a draft bubble until the final message frame arrives
+          setMessages(prev => {
+            const last = prev[prev.length - 1];
+            if (last && last.id === STREAMING_ID) {
+              return [...prev.slice(0, -1), { ...last, text: last.text + parsed.content }];
+            }
+            return [...prev, { id: STREAMING_ID, role: 'model', text: parsed.content, timestamp: new Date() }];
+          });
+          setIsLoading(false);
         } else if (parsed.type === 'message') {
           const botMsg: Message = {
             id: Date.now().toString(),
@@ -96,7 +114,7 @@ const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDark
             text: parsed.content,
             timestamp: new Date()
           };
-          setMessages(prev => [...prev, botMsg]);
+          setMessages(prev => [...prev.filter(m => m.id !== STREAMING_ID), botMsg]);
           setIsLoading(false);
         }
       } catch (e) {
@@ -391,6 +409,16 @@ const ChatArea: React.FC<ChatAreaProps> = ({ isVoiceMode, setIsVoiceMode, isDark
 
       {/* Messages List */}
       <div className="flex-1 overflow-y-auto p-4 md:p-8 space-y-6">
+        {historyCursor && (
+          <div className="flex justify-center">
+            <button
+              onClick={() => webSocketService.loadHistory(historyCursor)}
+              className="text-xs text-text-muted dark:text-[#94A3B8] hover:underline"
+            >
+              Load earlier messages
+            </button>
+          </div>
+        )}
         {messages.map((msg) => (
           <div
             key={msg.id}
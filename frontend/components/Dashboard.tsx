@@ -14,18 +14,41 @@ const Dashboard: React.FC<DashboardProps> = ({ isDarkMode, user }) => {
   const [moodData, setMoodData] = useState<any[]>([]);
   const [stressData, setStressData] = useState<any[]>([]);
   const [analysis, setAnalysis] = useState("Your insights will appear here as you chat with Pandora.");
+  const [recentEmotions, setRecentEmotions] = useState<string[]>([]);
 
   useEffect(() => {
-    if (user?.id) {
-      fetch(`http://localhost:8000/analytics/dashboard/${user.id}`)
-        .then(res => res.json())
-        .then(data => {
-            setMoodData(data.mood_data || []);
-            setStressData(data.stress_data || []);
-            if (data.analysis) setAnalysis(data.analysis);
-        })
-        .catch(err => console.error("Failed to fetch analytics", err));
-    }
+    if (!user?.id) return;
+
+    // Live dashboard: a snapshot on connect, then per-day deltas as moods are logged
+    const ws = new WebSocket(`ws://localhost:8000/analytics/ws/dashboard/${user.id}`);
+    // A day not on the chart yet (e.g. after midnight) joins the end and the oldest day leaves
+    const replaceDay = (points: any[], point: any) =>
+      points.some(p => p.day === point.day)
+        ? points.map(p => (p.day === point.day ? point : p))
+        : [...points.slice(1), point];
+    // Moods stamped at or before this are already in the snapshot
+    let watermark: number | null = null;
+
+    ws.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'snapshot') {
+        watermark = data.watermark ? Date.parse(data.watermark) : null;
+        setMoodData(data.mood_data || []);
+        setStressData(data.stress_data || []);
+        setRecentEmotions(data.recent_emotions || []);
+        if (data.analysis) setAnalysis(data.analysis);
+      } else if (data.type === 'delta') {
+        if (watermark !== null && data.created_at && Date.parse(data.created_at) <= watermark) return;
+        setMoodData(prev => replaceDay(prev, data.mood_point));
+        setStressData(prev => replaceDay(prev, data.stress_point));
+        setRecentEmotions(data.recent_emotions || []);
+      } else if (data.type === 'analysis') {
+        setAnalysis(data.analysis);
+      }
+    };
+    ws.onerror = (err) => console.error("Dashboard updates failed", err);
+
+    return () => ws.close();
   }, [user]);
 
   // Select active color palette
@@ -41,6 +64,11 @@ const Dashboard: React.FC<DashboardProps> = ({ isDarkMode, user }) => {
       <div className="mb-8">
         <h2 className="text-3xl font-light text-text-primary dark:text-[#E2E8F0] mb-2">Your Insights</h2>
         <p className="text-text-muted dark:text-[#94A3B8]">{analysis}</p>
+        {recentEmotions.length > 0 && (
+          <p className="mt-2 text-sm text-text-muted dark:text-[#94A3B8]">
+            Recently: {recentEmotions.join(' · ')}
+          </p>
+        )}
       </div>
 
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { X } from 'lucide-react';
 
 interface WellnessModalProps {
@@ -29,6 +29,21 @@ export const WellnessModal: React.FC<WellnessModalProps> = ({ isOpen, onClose, u
 
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<any>(null);
+  // Summary polling: the pending timer, and a run id so a poll in flight stops after close
+  const pollTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const pollRun = useRef(0);
+
+  const stopPolling = () => {
+    pollRun.current += 1;
+    if (pollTimer.current) clearTimeout(pollTimer.current);
+    pollTimer.current = null;
+  };
+
+  // Closing the modal (or unmounting it) cancels any summary polling
+  useEffect(() => {
+    if (!isOpen) stopPolling();
+    return stopPolling;
+  }, [isOpen]);
 
   useEffect(() => {
     if (isOpen && userId) {
@@ -52,6 +67,24 @@ export const WellnessModal: React.FC<WellnessModalProps> = ({ isOpen, onClose, u
 
   if (!isOpen) return null;
 
+  // The prediction comes back right away; the written summary is generated in the background
+  const pollSummary = async (attempt = 0, run = pollRun.current) => {
+    if (attempt >= 20 || run !== pollRun.current) return;
+    try {
+      const res = await fetch(`http://localhost:8000/assessment/summary/${userId}`);
+      const data = await res.json();
+      if (run !== pollRun.current) return;
+      if (data.status === 'ready' || data.status === 'failed') {
+        setResult((prev: any) => (prev ? { ...prev, llm_analysis: data.summary } : prev));
+        return;
+      }
+    } catch (err) {
+      console.error("Failed to fetch assessment summary:", err);
+    }
+    if (run !== pollRun.current) return;
+    pollTimer.current = setTimeout(() => pollSummary(attempt + 1, run), 1500);
+  };
+
   const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement>) => {
     const { name, value } = e.target;
     setFormData(prev => ({
@@ -77,6 +110,10 @@ export const WellnessModal: React.FC<WellnessModalProps> = ({ isOpen, onClose, u
       
       const data = await response.json();
       setResult(data);
+      if (data.summary_status === 'pending') {
+        stopPolling();
+        pollSummary(0, pollRun.current);
+      }
     } catch (error) {
       console.error('Error submitting assessment:', error);
     } finally {
@@ -1,4 +1,4 @@
-import { Message } from '../types';
+import { Message, HistoryCursor } from '../types';
 
 const WS_URL = 'ws://localhost:8000/ws/chat';
 
@@ -40,6 +40,11 @@ class WebSocketService {
     }
   }
 
+  loadHistory(cursor: HistoryCursor) {
+    // Control frame: asks the server for the page of history older than `cursor`
+    this.sendMessage(JSON.stringify({ type: 'load_history', cursor }));
+  }
+
   disconnect() {
     if (this.ws) {
       this.ws.close();
@@ -5,6 +5,11 @@ export interface Message {
   timestamp: Date;
 }
 
+export interface HistoryCursor {
+  before: string;
+  before_id: string | number | null;
+}
+
 export interface MoodData {
   day: string;
   value: number; // 1-10 scale